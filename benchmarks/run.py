@@ -0,0 +1,206 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from benchmarks.synthetic import NamedBytes, XLSX_MAX_ROWS, make_frame, to_bytes
+from utils.analytics import RangeAnalytics
+from utils.compact import compact_dtypes, memory_bytes
+from utils.cow import enable_copy_on_write
+from utils.downsample import decimate, use_webgl
+from utils.export import write_frame
+from utils.forecast import METHODS
+from utils.infer import apply_schema, infer_schema
+from utils.ingest import read_upload
+from utils.pipeline import forecast_all
+from utils.pyramid import AggregatePyramid
+from utils.smoothing import SMOOTHING_METHODS
+from utils.stats_index import StatsIndex
+from utils.timeindex import canonicalize, range_positions, slice_range
+
+# Benchmark jalur komputasi halaman pada dataset sintetis; hasil JSON untuk dibandingkan antar run.
+#   python -m benchmarks.run --rows 1000 100000 --cols 2 50 -o hasil.json [--baseline run_lama.json]
+
+# ====== Konfigurasi default ======
+DEFAULT_ROWS = [1_000, 100_000]
+DEFAULT_COLS = [2, 50]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# to_excel/openpyxl lambat untuk data besar → parse XLSX hanya sampai batas ini (bisa dinaikkan)
+XLSX_BENCH_MAX_ROWS = 100_000
+# Holt/Holt-Winters loop per observasi → dibatasi agar sweep 10 juta baris tetap selesai
+SMOOTHING_BENCH_MAX_ROWS = 200_000
+# seri yang digambar di chart multi-series
+FIGURE_MAX_SERIES = 10
+
+
+def _time(fn, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"repeat": repeat, "min_ms": min(times), "median_ms": statistics.median(times),
+            "mean_ms": statistics.fmean(times)}
+
+
+def _cases(raw: pd.DataFrame, args):
+    """Generator (nama, fungsi) atau (nama, alasan skip) untuk satu ukuran dataset.
+
+    Input tiap kasus disiapkan di luar fungsi yang diukur.
+    """
+    rows, cols = raw.shape[0], raw.shape[1] - 1
+    csv_bytes = to_bytes(raw, "csv")
+    yield "parse_csv", lambda: read_upload(NamedBytes(csv_bytes, "bench.csv"))
+
+    if rows > min(args.xlsx_max_rows, XLSX_MAX_ROWS):
+        yield "parse_xlsx", f"dilewati: > {min(args.xlsx_max_rows, XLSX_MAX_ROWS):,} baris"
+    else:
+        xlsx_bytes = to_bytes(raw, "xlsx")
+        yield "parse_xlsx", lambda: read_upload(NamedBytes(xlsx_bytes, "bench.xlsx"))
+
+    parsed = read_upload(NamedBytes(csv_bytes, "bench.csv"))  # tanggal masih teks, seperti hasil parse
+    date_text = parsed.iloc[:, 0]
+    yield "date_coercion", lambda: pd.to_datetime(date_text, errors="coerce")
+    yield "infer_types", lambda: apply_schema(parsed, infer_schema(parsed))
+    typed, _ = apply_schema(parsed, infer_schema(parsed))  # kolom tanggal hanya dikonversi di sini
+    yield "compact_dtypes", lambda: compact_dtypes(typed)
+    compact, _ = compact_dtypes(typed)
+    yield "canonicalize", lambda: canonicalize(compact)
+
+    df = canonicalize(compact)
+    date_col, value_cols = df.columns[0], list(df.columns[1:])
+    start, end = df.index[rows // 4], df.index[3 * rows // 4]
+    yield "range_filter", lambda: slice_range(df, start, end)
+
+    def build_index():
+        index = StatsIndex(df)
+        for col in value_cols:
+            index.summary(col)
+        return index
+    yield "stats_index_build", build_index
+    index = build_index()
+    yield "score_cards", lambda: [(index.summary(c, start, end), index.window_delta(c, start, end))
+                                  for c in value_cols]
+
+    # monthly_agg lama digantikan pyramid agregat: bangun sekali, lalu query bulanan per rerun
+    yield "pyramid_build", lambda: AggregatePyramid(df)
+    pyramid = AggregatePyramid(df)
+    yield "monthly_agg", lambda: pyramid.query("M", start, end, value_cols, "sum")
+    yield "all_columns_analytics", lambda: RangeAnalytics(df, value_cols, start, end)
+
+    fig_cols = value_cols[:FIGURE_MAX_SERIES]
+    sub = slice_range(df, start, end)
+
+    def build_figure():
+        line_df = sub[[date_col] + fig_cols].dropna()
+        return px.line(decimate(line_df, date_col, fig_cols), x=date_col, y=fig_cols, template="plotly_dark",
+                       render_mode="webgl" if use_webgl(len(line_df)) else "auto")
+    yield "figure_build", build_figure
+    fig = build_figure()
+    yield "figure_serialize", lambda: fig.to_json()
+
+    lo, hi = range_positions(df, start, end)
+    # file export dihapus setelah kasus export selesai (sweep 10 juta baris bisa bergiga-giga)
+    with tempfile.TemporaryDirectory(prefix="bench_export_") as out_dir:
+        for fmt in ("csv", "parquet"):
+            yield f"export:{fmt}", lambda f=fmt: write_frame(df, os.path.join(out_dir, f"export.{f}"), f, lo, hi)
+
+    for method in METHODS + SMOOTHING_METHODS:
+        name = f"forecast:{method}"
+        if method in SMOOTHING_METHODS and rows > args.smoothing_max_rows:
+            yield name, f"dilewati: > {args.smoothing_max_rows:,} baris"
+        else:
+            yield name, lambda m=method: forecast_all(df, value_cols[:1], m, 12)
+    for method in METHODS:
+        yield f"batch_forecast:{method}", lambda m=method: forecast_all(df, value_cols, m, 12)
+
+
+def run(args, log=print) -> list:
+    """Semua kasus untuk setiap kombinasi args.rows × args.cols."""
+    results = []
+    for rows in args.rows:
+        for cols in args.cols:
+            raw = make_frame(rows, cols, args.seed)
+            size = {"rows": rows, "cols": cols, "dataset_mb": round(memory_bytes(raw) / 1024**2, 3)}
+            for name, fn in _cases(raw, args):
+                if isinstance(fn, str):
+                    results.append({"case": name, **size, "skipped": fn})
+                    continue
+                res = {"case": name, **size, **_time(fn, args.repeat)}
+                results.append(res)
+                log(f"{name:<40} {rows:>10,} × {cols:<4} {res['median_ms']:>12,.2f} ms")
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().astimezone().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare(baseline: dict, current: dict) -> pd.DataFrame:
+    """Median run sekarang vs baseline per (case, rows, cols); rasio < 1 berarti lebih cepat."""
+    def frame(report):
+        df = pd.DataFrame([r for r in report["results"] if "median_ms" in r])
+        return df.set_index(["case", "rows", "cols"])["median_ms"] if not df.empty else pd.Series(dtype=float)
+    out = pd.concat({"baseline_ms": frame(baseline), "current_ms": frame(current)}, axis=1).dropna()
+    out["ratio"] = out["current_ms"] / out["baseline_ms"]
+    return out.reset_index()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Benchmark jalur komputasi halaman pada dataset sintetis.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="mis. 1000 100000 10000000")
+    parser.add_argument("--cols", type=int, nargs="+", default=DEFAULT_COLS, help="mis. 2 50 500")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--xlsx-max-rows", type=int, default=XLSX_BENCH_MAX_ROWS)
+    parser.add_argument("--smoothing-max-rows", type=int, default=SMOOTHING_BENCH_MAX_ROWS)
+    parser.add_argument("-o", "--output", help="file JSON hasil (default: benchmarks/results/<waktu>.json)")
+    parser.add_argument("--baseline", help="file JSON run sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    enable_copy_on_write()  # ukur dengan semantik pandas yang sama dengan app
+    report = {
+        "environment": environment(),
+        "params": {k: getattr(args, k) for k in ("rows", "cols", "repeat", "seed", "xlsx_max_rows",
+                                                  "smoothing_max_rows")},
+        "results": run(args),
+    }
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            diff = compare(json.load(f), report)
+        print(diff.to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
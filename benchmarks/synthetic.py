@@ -0,0 +1,56 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+# batas baris satu sheet Excel (termasuk header)
+XLSX_MAX_ROWS = 1_048_575
+# sampai jumlah baris ini data harian; di atasnya per menit (harian 10 juta baris melewati tahun 2262)
+DAILY_MAX_ROWS = 50_000
+
+
+def make_frame(rows: int, cols: int, seed: int = 0, freq: str = None, start: str = "2000-01-01") -> pd.DataFrame:
+    """Dataset sintetis: kolom tanggal + `cols` seri numerik (random walk bertren + musiman mingguan).
+
+    Deterministik untuk (rows, cols, seed) yang sama.
+    """
+    rng = np.random.default_rng(seed)
+    freq = freq or ("D" if rows <= DAILY_MAX_ROWS else "min")
+    t = np.arange(rows, dtype=np.float64)
+    data = {"Tanggal": pd.date_range(start, periods=rows, freq=freq)}
+    for j in range(cols):
+        level = rng.uniform(1, 20_000)
+        walk = np.cumsum(rng.normal(0, level * 0.002, rows))
+        season = level * 0.01 * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 2 * np.pi))
+        data[f"Seri_{j + 1}"] = np.round(level + walk + season + rng.uniform(-1, 1) * 1e-4 * level * t, 4)
+    return pd.DataFrame(data)
+
+
+def to_bytes(df: pd.DataFrame, fmt: str) -> bytes:
+    """Serialisasi dataset ke isi file .csv / .xlsx (seperti file yang diunggah pengguna)."""
+    buf = io.BytesIO()
+    if fmt == "csv":
+        df.to_csv(buf, index=False)
+    elif fmt == "xlsx":
+        if len(df) > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX maksimal {XLSX_MAX_ROWS:,} baris data per sheet.")
+        df.to_excel(buf, index=False, engine="openpyxl")
+    else:
+        raise ValueError(f"Format '{fmt}' tidak didukung (csv/xlsx).")
+    return buf.getvalue()
+
+
+def write_workbook(df: pd.DataFrame, path: str):
+    """Tulis dataset sintetis ke path; format dari ekstensi (.csv/.xlsx)."""
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    with open(path, "wb") as f:
+        f.write(to_bytes(df, fmt))
+
+
+class NamedBytes(io.BytesIO):
+    """BytesIO dengan atribut name, meniru UploadedFile Streamlit untuk utils.ingest."""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
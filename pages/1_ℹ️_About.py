@@ -1,7 +1,12 @@
 import streamlit as st
 
+from utils.perf import begin, panel
+
+begin("About")
+
 # ================== PAGE CONFIG ==================
 st.set_page_config(page_title="Tentang Aplikasi", page_icon="ℹ️", layout="wide")
+panel()
 st.header("ℹ️ Tentang Aplikasi")
 
 # ================== DESKRIPSI SINGKAT ==================
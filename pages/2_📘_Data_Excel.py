@@ -1,36 +1,148 @@
 import streamlit as st
-from utils.load_css import load_css
-import pandas as pd
-from utils.auth import is_logged_in
+
+from utils.perf import begin, panel, stage
+
+# rekaman rerun dimulai sebelum import modul halaman agar waktu import ikut terukur
+begin("Data Excel")
+with stage("import:halaman"):
+    from utils.load_css import load_css
+    import pandas as pd
+    from utils.auth import is_logged_in
+    from utils.ingest import (
+        SHEET_COL, dataset_types, load_combined, load_sheets, load_upload, sheet_names, type_schema,
+    )
+    from utils.compact import memory_bytes
+    from utils.registry import (
+        append_session_dataset, get_session_dataset, get_session_key, set_session_dataset,
+    )
+    from utils.table_view import paged_table
 
 if not is_logged_in():
     st.warning("⚠️ Silakan login terlebih dahulu di halaman 🔐 Login.")
     st.stop()
 
 #load_css("style.css")
+panel()
 st.header("📘 Pengolahan Data Excel")
 st.write("Unggah file Excel untuk dianalisis. Sistem akan menampilkan data, "
          "menentukan tipe data numerik dan kategorikal, serta memberikan ringkasan statistik awal.")
 
 # ========== Bagian Upload ==========
+APPEND_MODE = "Tambah data (append)"
 with st.expander("📂 Unggah File Excel", expanded=True):
-    uploaded_file = st.file_uploader("Pilih file Excel", type=["xlsx", "xls"])
+    mode = st.radio("Mode unggah", ["Ganti dataset", APPEND_MODE], horizontal=True,
+                    help="Tambah data: unggah file kecil berisi baris baru dengan kolom yang sama seperti dataset.")
+    if mode == APPEND_MODE:
+        uploaded_file = st.file_uploader("Pilih file tambahan (Excel/CSV)", type=["xlsx", "xls", "csv"],
+                                         key="upload_delta")
+    else:
+        uploaded_file = st.file_uploader("Pilih file Excel/CSV", type=["xlsx", "xls", "csv"], key="upload_full")
 
 if uploaded_file is not None:
     try:
-        df = pd.read_excel(uploaded_file)
-        st.session_state["uploaded_df"] = df
-        st.success("✅ File berhasil dibaca!")
+        df = None
+        if mode == APPEND_MODE:
+            # delta yang sama tidak ditambahkan dua kali saat rerun
+            if st.session_state.get("append_file_id") != uploaded_file.file_id:
+                # file tambahan dikonversi dengan skema tipe dataset aktif (format tanggal/angka sama)
+                schema = type_schema(dataset_types(get_session_key()))
+                delta_key, delta, _ = load_upload(uploaded_file, schema=schema or None)
+                with stage("append"):
+                    st.session_state["append_result"] = append_session_dataset(delta_key, delta)
+                st.session_state["append_file_id"] = uploaded_file.file_id
+                st.session_state["uploaded_mem_report"] = None
+            added, skipped = st.session_state["append_result"]
+            df = get_session_dataset()
+            st.success(f"✅ {added:,} baris baru ditambahkan ({skipped:,} baris duplikat/tanpa tanggal dilewati).")
+        else:
+            # daftar sheet dari metadata workbook (tanpa membaca isi sel), sekali per file
+            if st.session_state.get("sheet_list_id") != uploaded_file.file_id:
+                st.session_state["sheet_list"] = sheet_names(uploaded_file)
+                st.session_state["sheet_list_id"] = uploaded_file.file_id
+            sheets = st.session_state["sheet_list"]
+
+            selection = None
+            if len(sheets) > 1:
+                with st.expander(f"🗂️ Pilih Sheet ({len(sheets)} sheet)", expanded=True):
+                    chosen = st.multiselect("Sheet yang dimuat", sheets, default=sheets[:1],
+                                            key=f"sheets_{uploaded_file.file_id}")
+                    combine = st.toggle(f"Gabungkan sheet terpilih (format panjang dengan kolom **{SHEET_COL}**)",
+                                        key=f"sheets_combine_{uploaded_file.file_id}", disabled=len(chosen) < 2)
+                    combine = combine and len(chosen) > 1
+                    active = None
+                    if chosen and not combine:
+                        active = st.selectbox("Sheet aktif", chosen, key=f"sheet_active_{uploaded_file.file_id}")
+                    st.caption("Tiap sheet di-cache terpisah; sheet yang belum pernah dibaca di-parse paralel.")
+                if not chosen:
+                    raise ValueError("Pilih minimal satu sheet.")
+                selection = (tuple(chosen), combine, active)
+
+            # rerun dengan file & pilihan sheet yang sama → pakai DataFrame di session, tanpa parse ulang
+            load_id = (uploaded_file.file_id, selection)
+            if st.session_state.get("uploaded_file_id") == load_id:
+                df = get_session_dataset()
+            if df is None:
+                bar = st.progress(0.0, text="Membaca file…")
+                progress = lambda p: bar.progress(p, text=f"Membaca file… {p:.0%}")
+                if selection is None:
+                    key, df, mem_report = load_upload(uploaded_file, progress=progress)
+                elif combine:
+                    key, df, mem_report = load_combined(uploaded_file, list(chosen), progress=progress)
+                else:
+                    # semua sheet terpilih dimuat (paralel) agar berpindah sheet aktif tidak parse ulang
+                    key, df, mem_report = load_sheets(uploaded_file, list(chosen), progress=progress)[active]
+                bar.empty()
+                st.session_state["uploaded_file_id"] = load_id
+                set_session_dataset(key, df)
+                st.session_state["uploaded_mem_report"] = mem_report
+            st.success("✅ File berhasil dibaca!")
 
         # ========== Bagian DataFrame ==========
         with st.expander("📄 Tampilkan Data", expanded=True):
-            st.dataframe(df, use_container_width=True)
+            # hanya halaman aktif yang dikirim ke browser
+            paged_table(df, get_session_key(), "data_table")
 
         # ========== Bagian Identifikasi Tipe Data ==========
         with st.expander("🔍 Identifikasi Tipe Data"):
-            dtypes = df.dtypes.reset_index()
-            dtypes.columns = ["Kolom", "Tipe Data"]
-            st.table(dtypes)
+            c1, c2 = st.columns([2, 1])
+            with c1:
+                dtypes = df.dtypes.astype(str).reset_index()
+                dtypes.columns = ["Kolom", "Tipe Data"]
+                st.table(dtypes)
+            with c2:
+                mem_report = st.session_state.get("uploaded_mem_report")
+                after_mb = memory_bytes(df) / 1024**2
+                if mem_report:
+                    before_mb = mem_report["before"] / 1024**2
+                    st.metric("Memori sebelum", f"{before_mb:,.2f} MB")
+                    st.metric("Memori sesudah", f"{after_mb:,.2f} MB",
+                              delta=f"{after_mb - before_mb:,.2f} MB", delta_color="inverse")
+                else:
+                    st.metric("Memori", f"{after_mb:,.2f} MB")
+                    st.caption("Dimuat dari cache (tipe data sudah dipadatkan).")
+
+        # ========== Bagian Konversi Tipe Otomatis ==========
+        with st.expander("🧪 Konversi Tipe Otomatis"):
+            types = dataset_types(get_session_key())
+            if not types:
+                st.caption("Tidak ada kolom teks yang terdeteksi sebagai angka atau tanggal.")
+            else:
+                kinds = {"number": "Angka", "date": "Tanggal"}
+                formats = {"id": "1.234,56", "en": "1,234.56"}
+                rows = pd.DataFrame([{
+                    **({"Sheet": t["sheet"]} if "sheet" in t else {}),
+                    "Kolom": t["column"],
+                    "Jenis": kinds.get(t["kind"], t["kind"]),
+                    "Format": ", ".join(t["format"]) if t["kind"] == "date" else formats.get(t["format"], t["format"]),
+                    "Terisi": t["total"],
+                    "Gagal": t["failed"],
+                    "Gagal (%)": round(t["rate"] * 100, 2),
+                    "Dipakai": "✅" if t["applied"] else "❌ (terlalu banyak gagal)",
+                    "Contoh gagal": ", ".join(t["examples"]),
+                } for t in types])
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+                st.caption("Tipe & format ditebak dari sampel tiap kolom, lalu seluruh kolom dikonversi sekali. "
+                           "Nilai yang gagal dikonversi menjadi kosong (NaN/NaT).")
 
         # ========== Bagian Klasifikasi Kolom ==========
         with st.expander("🧮 Klasifikasi Kolom Numerik dan Kategorikal"):
@@ -43,7 +155,8 @@ if uploaded_file is not None:
         # ========== Bagian Statistik Deskriptif ==========
         with st.expander("📊 Statistik Deskriptif Awal"):
             if numeric_cols:
-                st.write(df[numeric_cols].describe())
+                with stage("describe"):
+                    st.write(df[numeric_cols].describe())
             else:
                 st.info("Tidak ada kolom numerik yang dapat dianalisis.")
 
@@ -51,4 +164,10 @@ if uploaded_file is not None:
         st.error(f"Terjadi kesalahan saat membaca file: {e}")
 
 else:
-    st.info("Silakan unggah file Excel untuk memulai analisis.")
+    active = get_session_dataset()
+    if active is not None:
+        # mis. setelah refresh/login ulang: dataset terakhir dipulihkan dari disk tanpa parse ulang
+        st.info(f"Dataset terakhir Anda masih aktif ({len(active):,} baris × {active.shape[1]:,} kolom) "
+                "dan dipakai di halaman lain. Unggah file untuk menggantinya.")
+    else:
+        st.info("Silakan unggah file Excel/CSV untuk memulai analisis.")
@@ -1,18 +1,32 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
-from utils.auth import is_logged_in
+from utils.perf import begin, fragment, panel, plotly_chart, stage, timed_import
+
+# rekaman rerun dimulai sebelum import modul halaman agar waktu import ikut terukur
+begin("Analisis")
+with stage("import:halaman"):
+    import numpy as np
+    import pandas as pd
+
+    from utils.analytics import DEFAULT_WINDOW, PERIODS, RangeAnalytics
+    from utils.auth import is_logged_in
+    from utils.export import export_panel
+    from utils.pipeline import describe_columns
+    from utils.registry import REGISTRY, get_session_dataset, get_session_key
+    from utils.stats_index import StatsIndex
+    from utils.table_view import paged_table
+    from utils.timeindex import date_bounds, has_time_index, range_positions, slice_range
 
 if not is_logged_in():
     st.warning("⚠️ Silakan login terlebih dahulu di halaman 🔐 Login.")
     st.stop()
 
 
+panel()
 st.header("📈 Analisis Deskriptif")
 
 # --- Ambil DataFrame dari session_state ---
-df = st.session_state.get("uploaded_df", None)
+df = get_session_dataset()
 if df is None:
     st.warning("⚠️ Belum ada data di memori. Silakan unggah file di halaman **📘 Data Excel** terlebih dulu.")
     st.stop()
@@ -36,30 +50,42 @@ if not numeric_cols:
 with st.expander("⚙️ Filter Analisis", expanded=True):
     target_col = st.selectbox("Pilih kolom numerik", numeric_cols, index=0)
 
-    if pd.api.types.is_datetime64_any_dtype(df[date_col]):
+    if has_time_index(df):
+        min_date, max_date = date_bounds(df)
         c1, c2 = st.columns(2)
         with c1:
-            start_date = st.date_input("Tanggal mulai", pd.to_datetime(df[date_col].min()))
+            start_date = st.date_input("Tanggal mulai", min_date)
         with c2:
-            end_date = st.date_input("Tanggal akhir", pd.to_datetime(df[date_col].max()))
-        mask = (df[date_col] >= pd.to_datetime(start_date)) & (df[date_col] <= pd.to_datetime(end_date))
-        fdf = df.loc[mask].copy()
+            end_date = st.date_input("Tanggal akhir", max_date)
+        with stage("filter"):
+            fdf = slice_range(df, start_date, end_date)
         st.caption(f"Baris terpilih: **{len(fdf):,}**")
     else:
         st.info(f"Kolom pertama (**{date_col}**) bukan tanggal, filter tanggal dinonaktifkan.")
-        fdf = df.copy()
+        fdf = df
+        start_date = end_date = None
 
 # =================== DATA TERFILTER (Accordion) ===================
 with st.expander("📊 Data Terfilter", expanded=False):
-    st.dataframe(fdf, use_container_width=True)
+    # hanya halaman aktif yang dikirim ke browser
+    lo, hi = range_positions(df, start_date, end_date)
+    paged_table(df, get_session_key(), "analisis_table", lo, hi)
+    # export dialirkan per potongan langsung dari slice rentang yang sama
+    st.markdown("**Export data terfilter**")
+    export_panel(df, "export_analisis", "data_terfilter", lo, hi, version=get_session_key())
 
 # =================== METRIK RINGKAS (Accordion) ===================
+# indeks prefix-sum dibangun sekali per dataset → metrik rentang tanpa scan baris
+with stage("score_cards"):
+    stats_index = REGISTRY.derived(get_session_key(), "stats", StatsIndex)
+    summary = stats_index.summary(target_col, start_date, end_date)
+
 with st.expander("📋 Indikator", expanded=True):
-    mean_val  = fdf[target_col].mean()
-    sum_val   = fdf[target_col].sum()
-    min_val   = fdf[target_col].min()
-    max_val   = fdf[target_col].max()
-    count_val = fdf[target_col].count()
+    mean_val  = summary["mean"]
+    sum_val   = summary["sum"]
+    min_val   = summary["min"]
+    max_val   = summary["max"]
+    count_val = summary["count"]
 
     c1, c2, c3, c4, c5 = st.columns(5)
     #c1.metric("Rata-rata (mean)", f"{mean_val:,.4f}")
@@ -71,4 +97,79 @@ with st.expander("📋 Indikator", expanded=True):
 
 # =================== STATISTIK DESKRIPTIF (Accordion) ===================
 with st.expander(f"🧮 Statistik Deskriptif: {target_col}", expanded=False):
-    st.write(fdf[target_col].describe())
\ No newline at end of file
+    # engine yang sama dengan CLI batch (utils.pipeline)
+    with stage("describe"):
+        described = describe_columns(df, [target_col], start_date, end_date, index=stats_index)
+    st.write(described[target_col])
+    export_panel(described.T.rename_axis("Kolom").reset_index(), "export_describe", f"statistik_{target_col}",
+                 version=(get_session_key(), target_col, start_date, end_date))
+
+
+# =================== ANALISIS SEMUA KOLOM (Accordion) ===================
+# batas kolom pada heatmap (kolom dengan korelasi rata-rata tertinggi); ringkasan tetap semua kolom
+HEATMAP_MAX_COLS = 100
+
+
+def _top_pairs(corr: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    upper = np.triu(np.ones(corr.shape, dtype=bool), k=1) & np.isfinite(corr.to_numpy())
+    i, j = np.nonzero(upper)
+    r = corr.to_numpy()[i, j]
+    top = np.argsort(-np.abs(r), kind="stable")[:n]
+    return pd.DataFrame({"Kolom A": corr.index[i[top]], "Kolom B": corr.columns[j[top]], "Korelasi": r[top]})
+
+
+@st.fragment
+@fragment("semua_kolom")
+def all_columns_panel(key, cols, start, end):
+    # fragment: ubah jendela/periode hanya menghitung ulang panel ini. Argumen fragment disimpan
+    # Streamlit sampai rerun penuh berikutnya → hanya key; DataFrame diambil dari registry di sini
+    if not st.toggle(f"Hitung untuk semua {len(cols):,} kolom numerik", value=False, key="show_all_cols"):
+        st.caption("Korelasi, rolling mean/volatilitas, dan return periode untuk semua kolom sekaligus.")
+        return
+    df = get_session_dataset()
+    if df is None or get_session_key() != key:
+        st.warning("Dataset tidak ada di memori. Unggah ulang data di halaman **📘 Data Excel**.")
+        return
+    periods = PERIODS if has_time_index(df) else {"": PERIODS[""]}
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        period = st.selectbox("Periode return", list(periods), format_func=periods.get, key="all_period")
+    with c2:
+        window = st.number_input("Jendela rolling (periode)", min_value=2, max_value=1000,
+                                 value=DEFAULT_WINDOW, step=1, key="all_window")
+    with c3:
+        basis = st.radio("Korelasi dari", ["return", "value"], horizontal=True, key="all_basis",
+                         format_func={"return": "Return", "value": "Nilai"}.get)
+
+    # hasil di-cache di registry per (dataset, rentang, periode, jendela, basis); jumlahnya dibatasi LRU
+    with stage("analytics"):
+        result = REGISTRY.result(key, f"analytics:{start}:{end}:{period}:{window}:{basis}",
+                                  lambda d: RangeAnalytics(d, cols, start, end, int(window), period, basis))
+
+    corr = result.corr
+    if len(cols) > HEATMAP_MAX_COLS:
+        keep = result.summary.nlargest(HEATMAP_MAX_COLS, "Korelasi |r| rata-rata")["Kolom"].tolist()
+        corr = corr.loc[keep, keep]
+        st.caption(f"Heatmap menampilkan {HEATMAP_MAX_COLS} kolom dengan korelasi rata-rata tertinggi "
+                   f"dari {len(cols):,} kolom.")
+    px = timed_import("plotly.express")
+    label = "Return" if basis == "return" else "Nilai"
+    with stage("figure:heatmap"):
+        fig = px.imshow(corr, zmin=-1, zmax=1, color_continuous_scale="RdBu_r", aspect="auto",
+                        template="plotly_dark", title=f"Matriks Korelasi ({label})")
+        fig.update_layout(height=min(max(400, 14 * len(corr)), 1400))
+    plotly_chart(fig, "heatmap", use_container_width=True)
+
+    st.markdown("**Pasangan dengan korelasi terkuat**")
+    st.dataframe(_top_pairs(result.corr), hide_index=True, use_container_width=True)
+    st.markdown("**Ringkasan per kolom** (klik judul kolom untuk mengurutkan)")
+    st.dataframe(result.summary.round(4), hide_index=True, use_container_width=True)
+    export_panel(result.summary, "export_all_columns", "ringkasan_semua_kolom")
+
+
+with st.expander("🧭 Analisis Semua Kolom", expanded=False):
+    all_columns_panel(get_session_key(), numeric_cols, start_date, end_date)
+
+# fungsi fragment yang disimpan Streamlit ikut memegang globals halaman ini sampai rerun penuh
+# berikutnya; lepas DataFrame di sini agar sesi idle tidak menahan dataset (lihat REGISTRY.release_idle)
+df = fdf = stats_index = None
@@ -1,8 +1,21 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
-from utils.auth import is_logged_in
+from utils.perf import begin, fragment, panel, plotly_chart, stage, timed_import
+
+# rekaman rerun dimulai sebelum import modul halaman agar waktu import ikut terukur
+begin("Visualisasi")
+with stage("import:halaman"):
+    import pandas as pd
+    import numpy as np
+
+    from utils.auth import is_logged_in
+    from utils.registry import REGISTRY, get_session_dataset, get_session_key
+    from utils.timeindex import date_bounds, has_time_index, range_positions, slice_range
+    from utils.downsample import decimate, use_webgl
+    from utils.export import export_panel
+    from utils.pyramid import LEVEL_DAYS, LEVELS, STATS, AggregatePyramid
+    from utils.regression import DENSITY_THRESHOLD, cached_density, cached_fit
+    from utils.stats_index import StatsIndex
 
 if not is_logged_in():
     st.warning("⚠️ Silakan login terlebih dahulu di halaman 🔐 Login.")
@@ -11,24 +24,20 @@ if not is_logged_in():
 
 # ================== PAGE CONFIG ==================
 st.set_page_config(page_title="Visualisasi", page_icon="📊", layout="wide")
+panel()
 st.header("📊 Visualisasi")
 
 
 # ================== DATA SOURCE (SESSION) ==================
-df = st.session_state.get("uploaded_df", None)
+df = get_session_dataset()
 if df is None:
     st.warning("⚠️ Belum ada data di memori. Silakan unggah file di halaman **📘 Data Excel** terlebih dulu.")
     st.stop()
 
 
 
-# Pastikan kolom pertama adalah tanggal bila memungkinkan
+# Kolom pertama = tanggal (sudah di-parse & diurutkan sekali saat ingest)
 date_col = df.columns[0]
-if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
-    try:
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    except Exception:
-        pass
 
 numeric_cols = df.select_dtypes(include="number").columns.tolist()
 if not numeric_cols:
@@ -37,25 +46,32 @@ if not numeric_cols:
 
 # ================== FILTER PANEL ==================
 with st.expander("⚙️ Filter", expanded=True):
-    c1, c2, c3 = st.columns([1, 1, 2])
+    # Kolom X scatter ada di panel Scatter: mengubahnya hanya menjalankan ulang grafik itu
+    c1, c3 = st.columns([1, 2])
     with c1:
         target_y = st.selectbox("Kolom Y (utama)", numeric_cols, index=0)
-    with c2:
-        scatter_x = st.selectbox("Kolom X (untuk Scatter)", numeric_cols, index=1)
     with c3:
         mult_cols = st.multiselect("Kolom numerik (untuk Pie & Multi-series Bar)", numeric_cols)
 
-    if pd.api.types.is_datetime64_any_dtype(df[date_col]):
+    if has_time_index(df):
+        min_date, max_date = date_bounds(df)
         r1, r2 = st.columns(2)
         with r1:
-            start_date = st.date_input("Tanggal mulai", pd.to_datetime(df[date_col].min()))
+            start_date = st.date_input("Tanggal mulai", min_date)
         with r2:
-            end_date = st.date_input("Tanggal akhir", pd.to_datetime(df[date_col].max()))
-        mask = (df[date_col] >= pd.to_datetime(start_date)) & (df[date_col] <= pd.to_datetime(end_date))
-        fdf = df.loc[mask].copy()
+            end_date = st.date_input("Tanggal akhir", max_date)
+        with stage("filter"):
+            fdf = slice_range(df, start_date, end_date)
     else:
         st.info(f"Kolom pertama (**{date_col}**) bukan tanggal. Filter tanggal dinonaktifkan.")
-        fdf = df.copy()
+        fdf = df
+        start_date = end_date = None
+
+dataset_key = get_session_key()
+lo, hi = range_positions(df, start_date, end_date)
+
+with st.expander("⬇️ Export Data Terfilter", expanded=False):
+    export_panel(df, "export_visualisasi", "data_visualisasi", lo, hi, version=dataset_key)
 
 st.divider()
 st.subheader("📌 Score Cards")
@@ -69,20 +85,18 @@ else:
     # ambil kolom utama (Y) untuk contoh
     main_col = target_y 
 
-    total_rows = len(fdf)
-    avg_val = fdf[main_col].mean()
-    max_val = fdf[main_col].max()
-    min_val = fdf[main_col].min()
-
-    # hitung delta 7 hari terakhir (jika ada kolom tanggal)
-    delta_text = None
-    if pd.api.types.is_datetime64_any_dtype(fdf[date_col]):
-        last_week = fdf[fdf[date_col] >= (fdf[date_col].max() - pd.Timedelta(days=7))]
-        prev_week = fdf[(fdf[date_col] < (fdf[date_col].max() - pd.Timedelta(days=7))) &
-                        (fdf[date_col] >= (fdf[date_col].max() - pd.Timedelta(days=14)))]
-        if not last_week.empty and not prev_week.empty:
-            delta_val = last_week[main_col].mean() - prev_week[main_col].mean()
-            delta_text = f"{delta_val:.2f}"
+    # metrik dari indeks prefix-sum + min/maks per blok (dibangun sekali per dataset)
+    with stage("score_cards"):
+        stats_index = REGISTRY.derived(dataset_key, "stats", StatsIndex)
+        summary = stats_index.summary(main_col, start_date, end_date)
+        total_rows = len(fdf)
+        avg_val = summary["mean"]
+        max_val = summary["max"]
+        min_val = summary["min"]
+
+        # delta rata-rata 7 hari terakhir vs 7 hari sebelumnya (jika ada kolom tanggal)
+        delta_val = stats_index.window_delta(main_col, start_date, end_date, days=7)
+    delta_text = f"{delta_val:.2f}" if delta_val is not None else None
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("📦 Jumlah Baris", f"{total_rows:,}")
@@ -90,101 +104,145 @@ else:
     c3.metric(f"⬆️ Maks ({main_col})", f"{max_val:,.2f}")
     c4.metric(f"⬇️ Min ({main_col})", f"{min_val:,.2f}")
 
-# ================== HELPERS ==================
-def monthly_agg(dataframe, y_cols):
-    out = dataframe.copy()
-    if pd.api.types.is_datetime64_any_dtype(out[date_col]):
-        out["__month__"] = out[date_col].dt.to_period("M").dt.to_timestamp()
-        return out.groupby("__month__", as_index=False)[y_cols].sum().sort_values("__month__")
-    # fallback tanpa tanggal
-    out["__row__"] = range(len(out))
-    return out
+# ================== CHART FRAGMENTS ==================
+# Tiap grafik adalah st.fragment: widget di dalamnya (granularitas, kolom X, toggle)
+# hanya menjalankan ulang grafik itu. Panel tanpa toggle aktif tidak menghitung apa pun
+# (st.expander tidak punya status buka/tutup yang bisa dibaca di Python).
 
-# ================== ROW 1: LINE & BAR ==================
-st.divider()
+def _show_toggle(key: str, default: bool) -> bool:
+    return st.toggle("Tampilkan grafik", value=default, key=key)
 
 
-col_left, col_right = st.columns(2, gap="small")
+def _range_frame(key, lo, hi):
+    # fragment hanya menerima key + posisi baris: Streamlit menyimpan argumen fragment sampai
+    # rerun penuh berikutnya, jadi DataFrame diambil ulang dari registry di dalam fragment
+    df = get_session_dataset()
+    if df is None or get_session_key() != key:
+        st.warning("Dataset tidak ada di memori. Unggah ulang data di halaman **📘 Data Excel**.")
+        return None
+    return df.iloc[lo:hi]
 
-with st.expander("📈 Line Chart (Multi-series)", expanded=False):
+
+@st.fragment
+@fragment("line_multi")
+def line_multi_chart(key, lo, hi, mult_cols):
     if len(mult_cols) == 0:
         st.warning("Pilih ≥1 kolom di **Kolom numerik (untuk Pie & Multi-series Bar)** agar multi-series tampil.")
-    else:
-        # batasi terlalu banyak seri agar tetap terbaca
-        cols_for_line = mult_cols
-        line_df = fdf[[date_col] + cols_for_line].dropna().sort_values(by=date_col)
+        return
+    if not _show_toggle("show_line_multi", False):
+        return
+    fdf = _range_frame(key, lo, hi)
+    if fdf is None:
+        return
+    # batasi terlalu banyak seri agar tetap terbaca
+    cols_for_line = mult_cols
+    # plotly diimport saat grafik pertama benar-benar dibuat
+    px = timed_import("plotly.express")
+    with stage("figure:line_multi"):
+        line_df = fdf[[date_col] + cols_for_line].dropna()
+        # kurangi titik per seri (LTTB) sebelum dikirim ke browser
+        plot_line_df = decimate(line_df, date_col, cols_for_line)
         fig_multi = px.line(
-            line_df,
+            plot_line_df,
             x=date_col,
             y=cols_for_line,         # wide-form: otomatis bikin beberapa trace
             markers=False,
+            render_mode="webgl" if use_webgl(len(line_df)) else "auto",
             template="plotly_dark",
             title="Tren Waktu (Multi-series)"
         )
-        # fig_multi.update_layout(
-        #     xaxis_title="Tanggal",
-        #     yaxis_title="Nilai",
-        #     legend_title="Seri",
-        #     hovermode="x unified",
-        #     xaxis=dict(tickformat="%d/%m/%Y", tickangle=-45)
-        # )
-        st.plotly_chart(fig_multi, use_container_width=True)
-
-with col_left:
-    with st.expander("📈 Line Chart", expanded=True):
-        if pd.api.types.is_datetime64_any_dtype(fdf[date_col]):
-            chart_df = fdf[[date_col, target_y]].sort_values(by=date_col)
-            fig = px.line(chart_df, x=date_col, y=target_y, markers=True, template="plotly_dark",
-                          title="Tren Waktu")
-            # fig.update_layout(hovermode="x unified", height=420, margin=dict(l=10, r=10, t=60, b=10),
-            #                   xaxis_title="Tanggal", yaxis_title=target_y)
-
-            fig.update_layout(
-                xaxis_title="Tanggal",
-                yaxis_title="Nilai",
-                legend_title="Kolom",
-                hovermode="x unified",
-                xaxis=dict(tickformat="%d/%m/%Y", tickangle=-45)
+    # fig_multi.update_layout(
+    #     xaxis_title="Tanggal",
+    #     yaxis_title="Nilai",
+    #     legend_title="Seri",
+    #     hovermode="x unified",
+    #     xaxis=dict(tickformat="%d/%m/%Y", tickangle=-45)
+    # )
+    plotly_chart(fig_multi, "line_multi", use_container_width=True)
+    if len(plot_line_df) < len(line_df):
+        st.caption(f"Ditampilkan {len(plot_line_df):,} dari {len(line_df):,} titik (LTTB).")
+
+
+@st.fragment
+@fragment("line")
+def line_chart(key, lo, hi, target_y):
+    fdf = _range_frame(key, lo, hi)
+    if fdf is None:
+        return
+    if not has_time_index(fdf):
+        st.info("Line chart memerlukan kolom tanggal yang valid di kolom pertama.")
+        return
+    if not _show_toggle("show_line", True):
+        return
+    px = timed_import("plotly.express")
+    with stage("figure:line"):
+        chart_df = fdf[[date_col, target_y]]
+        plot_chart_df = decimate(chart_df, date_col, [target_y])
+        # marker hanya untuk data kecil; data besar pakai WebGL
+        large = use_webgl(len(chart_df))
+        fig = px.line(plot_chart_df, x=date_col, y=target_y, markers=not large, template="plotly_dark",
+                      title="Tren Waktu", render_mode="webgl" if large else "auto")
+    # fig.update_layout(hovermode="x unified", height=420, margin=dict(l=10, r=10, t=60, b=10),
+    #                   xaxis_title="Tanggal", yaxis_title=target_y)
+
+    fig.update_layout(
+        xaxis_title="Tanggal",
+        yaxis_title="Nilai",
+        legend_title="Kolom",
+        hovermode="x unified",
+        xaxis=dict(tickformat="%d/%m/%Y", tickangle=-45)
+    )
+    plotly_chart(fig, "line", use_container_width=True)
+    if len(plot_chart_df) < len(chart_df):
+        st.caption(f"Ditampilkan {len(plot_chart_df):,} dari {len(chart_df):,} titik (LTTB).")
+
+
+@st.fragment
+@fragment("bar")
+def bar_chart(key, lo, hi, target_y, mult_cols, start_date, end_date):
+    if not _show_toggle("show_bar", True):
+        return
+    fdf = _range_frame(key, lo, hi)
+    if fdf is None:
+        return
+    cols_for_bar = mult_cols if len(mult_cols) > 0 else [target_y]
+    y_arg = cols_for_bar if len(cols_for_bar) > 1 else cols_for_bar[0]
+
+    if has_time_index(fdf) and len(fdf):
+        g1, g2 = st.columns([3, 2])
+        with g1:
+            gran = st.radio(
+                "Granularitas",
+                ["Otomatis"] + list(LEVELS.values()),
+                horizontal=True,
+                index=0
             )
-            st.plotly_chart(fig, use_container_width=True)
+        with g2:
+            stat = st.selectbox("Agregasi", STATS, index=0)
+
+        # agregat diambil dari pyramid (dibangun sekali per dataset)
+        with stage("agregat:pyramid"):
+            pyramid = REGISTRY.derived(key, "pyramid", AggregatePyramid)
+        if gran == "Otomatis":
+            level = pyramid.auto_level(start_date, end_date)
         else:
-            st.info("Line chart memerlukan kolom tanggal yang valid di kolom pertama.")
-
-# with col_right:
-#     with st.expander("📊 Bar Chart (Agregasi Bulanan)", expanded=True):
-#         cols_for_bar = mult_cols if len(mult_cols) > 0 else [target_y]
-#         agg_df = monthly_agg(fdf, cols_for_bar)
-#         y_arg = cols_for_bar if len(cols_for_bar) > 1 else cols_for_bar[0]
-#         x_arg = "__month__" if "__month__" in agg_df.columns else agg_df.columns[0]
-#         fig = px.bar(agg_df, x=x_arg, y=y_arg, barmode="group", template="plotly_dark",
-#                      title="Agregasi Bulanan")
-#         # fig.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10),
-#         #                   xaxis_title="Periode", yaxis_title="Nilai", legend_title="Kolom")
-#         st.plotly_chart(fig, use_container_width=True)
-
-with col_right:
-    with st.expander("📊 Bar Chart", expanded=True):
-        cols_for_bar = mult_cols if len(mult_cols) > 0 else [target_y]
-        y_arg = cols_for_bar if len(cols_for_bar) > 1 else cols_for_bar[0]
-
-        # gran = st.radio(
-        #     "Granularitas",
-        #     ["Harian", "Mingguan", "Bulanan"],
-        #     horizontal=True,
-        #     index=0
-        # )
-
-        tmp = fdf[[date_col] + cols_for_bar].dropna().copy()
+            level = next(k for k, v in LEVELS.items() if v == gran)
+        with stage("agregat:bar"):
+            tmp = pyramid.query(level, start_date, end_date, cols_for_bar, stat).dropna(how="all")
+        tmp = tmp.rename_axis(date_col).reset_index()
+        bar_days = LEVEL_DAYS[level]
+        st.caption(f"Level agregasi: **{LEVELS[level]}** · {len(tmp):,} periode")
+    else:
+        tmp = fdf[[date_col] + cols_for_bar].dropna()
+        bar_days = 1
 
-        # if gran == "Mingguan":
-        #     tmp = tmp.set_index(date_col).resample("W")[cols_for_bar].sum().reset_index()
-        # elif gran == "Bulanan":
-        #     tmp = tmp.set_index(date_col).resample("M")[cols_for_bar].sum().reset_index()
-        # else:
-        #     tmp = tmp.sort_values(by=date_col)
+    px = timed_import("plotly.express")
+    # bar tidak punya trace WebGL → batasi jumlah batang dengan min/maks per bucket
+    with stage("figure:bar"):
+        plot_tmp = decimate(tmp, date_col, cols_for_bar, method="minmax")
 
         fig = px.bar(
-            tmp.sort_values(by=date_col),
+            plot_tmp,
             x=date_col,
             y=y_arg,
             barmode="group",
@@ -192,24 +250,99 @@ with col_right:
             title="Bar Chart"
         )
 
-        # Kunci agar “column” tidak tampak area
-        one_day_ms = 24*60*60*1000
-        fig.update_traces(width=one_day_ms*0.80)      # lebar batang (jalan juga untuk weekly)
-        fig.update_layout(
-            bargap=0.30,                              # jarak antar tanggal
-            bargroupgap=0.10,                         # jarak antar seri pada tanggal yg sama
-            xaxis_title="Tanggal",
-            yaxis_title="Nilai",
-            legend_title="Kolom",
-            hovermode="x unified",
-            xaxis=dict(tickformat="%d/%m/%Y", tickangle=-45)
-        )
+    # Kunci agar “column” tidak tampak area
+    one_day_ms = 24*60*60*1000
+    fig.update_traces(width=one_day_ms*bar_days*0.80)      # lebar batang mengikuti panjang periode
+    fig.update_layout(
+        bargap=0.30,                              # jarak antar tanggal
+        bargroupgap=0.10,                         # jarak antar seri pada tanggal yg sama
+        xaxis_title="Tanggal",
+        yaxis_title="Nilai",
+        legend_title="Kolom",
+        hovermode="x unified",
+        xaxis=dict(tickformat="%d/%m/%Y", tickangle=-45)
+    )
+
+    plotly_chart(fig, "bar", use_container_width=True)
+    if len(plot_tmp) < len(tmp):
+        st.caption(f"Ditampilkan {len(plot_tmp):,} dari {len(tmp):,} batang (min/maks per bucket).")
+
+
+@st.fragment
+@fragment("pie")
+def pie_chart(key, lo, hi, mult_cols):
+    cols_for_pie = mult_cols
+    if len(cols_for_pie) == 0:
+        st.info("Pilih ≥1 kolom di **Kolom numerik (untuk Pie & Multi-series Bar)** untuk melihat komposisi.")
+        return
+    if not _show_toggle("show_pie", True):
+        return
+    fdf = _range_frame(key, lo, hi)
+    if fdf is None:
+        return
+    px = timed_import("plotly.express")
+    with stage("figure:pie"):
+        # Sum total periode terpilih untuk tiap kolom → komposisi
+        totals = fdf[cols_for_pie].sum(numeric_only=True)
+        pie_df = pd.DataFrame({"Variabel": totals.index, "Total": totals.values})
+        fig = px.pie(pie_df, names="Variabel", values="Total", hole=0.4, template="plotly_dark",
+                     title="Komposisi (Total pada Rentang Terpilih)")
+    # fig.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10))
+    plotly_chart(fig, "pie", use_container_width=True)
+
+
+@st.fragment
+@fragment("scatter")
+def scatter_chart(key, lo, hi, target_y, start_date, end_date):
+    scatter_x = st.selectbox("Kolom X (untuk Scatter)", numeric_cols, index=min(1, len(numeric_cols) - 1))
+    if not _show_toggle("show_scatter", True):
+        return
+    px, go = timed_import("plotly.express"), timed_import("plotly.graph_objects")
+    with stage("figure:scatter"):
+        # trendline closed-form, di-cache per (dataset, x, y, rentang) → tanpa statsmodels
+        fit = cached_fit(key, scatter_x, target_y, start_date, end_date)
+        if fit is None:
+            st.warning("Dataset tidak ada di memori. Unggah ulang data di halaman **📘 Data Excel**.")
+            return
+        if fit["n"] > DENSITY_THRESHOLD:
+            # mode densitas: ukuran grafik bergantung jumlah bin, bukan jumlah baris
+            counts, xc, yc = cached_density(key, scatter_x, target_y, start_date, end_date)
+            fig = go.Figure(go.Heatmap(x=xc, y=yc, z=counts.T, colorscale="Viridis", colorbar=dict(title="Jumlah")))
+            fig.update_layout(template="plotly_dark", title="Korelasi (Densitas)",
+                              xaxis_title=scatter_x, yaxis_title=target_y)
+        else:
+            fdf = _range_frame(key, lo, hi)
+            if fdf is None:
+                return
+            sc_df = fdf[[scatter_x, target_y]].dropna()
+            fig = px.scatter(sc_df, x=scatter_x, y=target_y, template="plotly_dark", title="Korelasi",
+                             render_mode="webgl" if use_webgl(len(sc_df)) else "auto")
+        if np.isfinite(fit["slope"]):
+            line_x = np.array([fit["x_min"], fit["x_max"]])
+            fig.add_trace(go.Scatter(x=line_x, y=fit["slope"] * line_x + fit["intercept"],
+                                     mode="lines", name="OLS", line=dict(color="#F59E0B")))
+    # fig.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10),
+    #                   xaxis_title=scatter_x, yaxis_title=target_y)
+    plotly_chart(fig, "scatter", use_container_width=True)
+    st.caption(f"y = {fit['slope']:,.4f}·x + {fit['intercept']:,.4f} · R² = {fit['r2']:.4f} · n = {fit['n']:,}")
+
+
+# ================== ROW 1: LINE & BAR ==================
+st.divider()
 
-        # Kalau tetap terlalu rapat (dataset super padat), pakai kategori string:
-        # tmp["__tgl__"] = tmp[date_col].dt.strftime("%Y-%m-%d")
-        # fig = px.bar(tmp, x="__tgl__", y=y_arg, barmode="group", template="plotly_dark")
 
-        st.plotly_chart(fig, use_container_width=True)
+col_left, col_right = st.columns(2, gap="small")
+
+with st.expander("📈 Line Chart (Multi-series)", expanded=False):
+    line_multi_chart(dataset_key, lo, hi, mult_cols)
+
+with col_left:
+    with st.expander("📈 Line Chart", expanded=True):
+        line_chart(dataset_key, lo, hi, target_y)
+
+with col_right:
+    with st.expander("📊 Bar Chart", expanded=True):
+        bar_chart(dataset_key, lo, hi, target_y, mult_cols, start_date, end_date)
 
 
 
@@ -218,22 +351,14 @@ col_left2, col_right2 = st.columns(2, gap="small")
 
 with col_left2:
     with st.expander("🥧 Pie Chart", expanded=True):
-        cols_for_pie = mult_cols 
-        # Sum total periode terpilih untuk tiap kolom → komposisi
-        totals = fdf[cols_for_pie].sum(numeric_only=True)
-        pie_df = pd.DataFrame({"Variabel": totals.index, "Total": totals.values})
-        fig = px.pie(pie_df, names="Variabel", values="Total", hole=0.4, template="plotly_dark",
-                     title="Komposisi (Total pada Rentang Terpilih)")
-        # fig.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10))
-        st.plotly_chart(fig, use_container_width=True)
+        pie_chart(dataset_key, lo, hi, mult_cols)
 
 with col_right2:
     with st.expander("🟣 Scatter Plot", expanded=True):
-        sc_df = fdf[[scatter_x, target_y]].dropna()
-        fig = px.scatter(sc_df, x=scatter_x, y=target_y, trendline="ols", template="plotly_dark",
-                         title="Korelasi")
-        # fig.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10),
-        #                   xaxis_title=scatter_x, yaxis_title=target_y)
-        st.plotly_chart(fig, use_container_width=True)
+        scatter_chart(dataset_key, lo, hi, target_y, start_date, end_date)
 
 # ================== FOOTER ==================
+
+# fungsi fragment yang disimpan Streamlit ikut memegang globals halaman ini sampai rerun penuh
+# berikutnya; lepas DataFrame di sini agar sesi idle tidak menahan dataset (lihat REGISTRY.release_idle)
+df = fdf = stats_index = None
@@ -1,10 +1,19 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-from datetime import timedelta
 
-from utils.auth import is_logged_in
+from utils.perf import begin, panel, plotly_chart, stage, timed_import
+
+# rekaman rerun dimulai sebelum import modul halaman agar waktu import ikut terukur
+begin("Forecasting")
+with stage("import:halaman"):
+    from utils.auth import is_logged_in
+    from utils.registry import get_session_dataset, get_session_key
+    from utils.timeindex import has_time_index
+    from utils.backtest import backtest_many, leaderboard
+    from utils.export import export_panel
+    from utils.forecast import METHODS, history
+    from utils.forecast_cache import cached_forecast
+    from utils.pipeline import forecast_all
+    from utils.smoothing import SMOOTHING_METHODS
 
 if not is_logged_in():
     st.warning("⚠️ Silakan login terlebih dahulu di halaman 🔐 Login.")
@@ -13,21 +22,18 @@ if not is_logged_in():
 
 # ================ PAGE CONFIG ================
 st.set_page_config(page_title="Forecasting & Best Practice", page_icon="🔮", layout="wide")
+panel()
 st.header("🔮 Forecasting & Best Practice")
 #st.caption("File: pages/4_🔮_Forecasting_&_Best_Practice.py")
 
 # ================ DATA SOURCE ================
-df = st.session_state.get("uploaded_df", None)
+df = get_session_dataset()
 if df is None:
     st.warning("⚠️ Belum ada data di memori. Unggah data di halaman **📘 Data Excel** dahulu.")
     st.stop()
 
+# kolom pertama = tanggal (sudah di-parse & diurutkan sekali saat ingest)
 date_col = df.columns[0]
-if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
-    try:
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    except Exception:
-        pass
 
 num_cols = df.select_dtypes(include="number").columns.tolist()
 if not num_cols:
@@ -44,7 +50,7 @@ with st.expander("⚙️ Pengaturan Forecast", expanded=True):
     with c2:
         method = st.selectbox(
             "Metode",
-            ["Linear Trend (Sederhana)", "Naive (Last Value)", "Rata-rata (Window)"],
+            METHODS + SMOOTHING_METHODS,
             index=0
         )
 
@@ -52,87 +58,45 @@ with st.expander("⚙️ Pengaturan Forecast", expanded=True):
         horizon = st.number_input("Horizon (langkah ke depan)", min_value=1, max_value=365, value=12, step=1)
 
     # Untuk smoothing opsional
-    window = st.slider("Window (untuk Rata-rata)", min_value=2, max_value=60, value=7, help="Dipakai jika metode Rata-rata (Window) dipilih.")
-
-# ================ HELPERS ================
-def infer_step(dts: pd.Series) -> pd.Timedelta:
-    """Ambil step waktu dominan; fallback median diff jika tidak jelas."""
-    s = dts.sort_values().dropna().unique()
-    if len(s) < 2:
-        return pd.Timedelta(days=1)
-    diffs = pd.Series(s[1:] - s[:-1])
-    # gunakan modus diff jika ada; fallback median
-    try:
-        step = diffs.mode().iloc[0]
-    except Exception:
-        step = diffs.median()
-    # guard: jika step==0, fallback 1 hari
-    if step == pd.Timedelta(0):
-        step = pd.Timedelta(days=1)
-    return step
-
-def make_future_dates(last_dt: pd.Timestamp, step: pd.Timedelta, n: int) -> pd.DatetimeIndex:
-    return pd.date_range(start=last_dt + step, periods=n, freq=step)
-
-def linear_trend_forecast(x_dt: pd.Series, y: pd.Series, n: int):
-    """Linear regression sederhana pada indeks waktu (ordinal)."""
-    # gunakan index berbasis urutan agar robust
-    x_idx = np.arange(len(y))
-    # fit y = a*x + b
-    a, b = np.polyfit(x_idx, y.values.astype(float), 1)
-    x_future = np.arange(len(y), len(y) + n)
-    y_future = a * x_future + b
-    return y_future
-
-def naive_last_value(y: pd.Series, n: int):
-    return np.repeat(y.dropna().iloc[-1], n)
-
-def rolling_mean_forecast(y: pd.Series, n: int, window: int):
-    base = y.rolling(window=window, min_periods=1).mean().iloc[-1]
-    return np.repeat(float(base), n)
-
-# ================ PREPARE DATA ================
-work = df[[date_col, target_y]].dropna().copy()
-work = work.sort_values(by=date_col)
-if not pd.api.types.is_datetime64_any_dtype(work[date_col]):
-    st.error(f"Kolom pertama (**{date_col}**) belum bertipe tanggal yang valid.")
-    st.stop()
-
-# pastikan tidak ada duplikat tanggal untuk plotting yang bersih
-work = work.drop_duplicates(subset=[date_col])
-
-# infer step & build future dates
-step = infer_step(work[date_col])
-future_index = make_future_dates(work[date_col].iloc[-1], step, horizon)
+    w1, w2 = st.columns([2, 1])
+    with w1:
+        window = st.slider("Window (untuk Rata-rata)", min_value=2, max_value=60, value=7, help="Dipakai jika metode Rata-rata (Window) dipilih.")
+    with w2:
+        season = st.number_input("Periode musim (Holt-Winters)", min_value=2, max_value=365, value=7, step=1,
+                                 help="Jumlah langkah dalam satu siklus, mis. 7 untuk mingguan pada data harian.")
 
 # ================ FORECASTING ================
-if method == "Linear Trend (Sederhana)":
-    y_hat = linear_trend_forecast(work[date_col], work[target_y], horizon)
-elif method == "Naive (Last Value)":
-    y_hat = naive_last_value(work[target_y], horizon)
-else:
-    y_hat = rolling_mean_forecast(work[target_y], horizon, window)
-
-fcst_df = pd.DataFrame({date_col: future_index, target_y: y_hat})
-fcst_df["Phase"] = "Forecast"
-hist_df = work.copy()
-hist_df["Phase"] = "History"
+if not has_time_index(df):
+    st.error(f"Kolom pertama (**{date_col}**) belum bertipe tanggal yang valid.")
+    st.stop()
+if df[target_y].notna().sum() == 0:
+    st.error(f"Kolom **{target_y}** tidak memiliki data.")
+    st.stop()
 
-plot_df = pd.concat([hist_df, fcst_df], ignore_index=True)
+# hasil di-cache per (dataset, target, metode, horizon, window): rerun karena
+# widget lain (mis. buka/tutup expander) tidak menghitung ulang forecast
+try:
+    with stage("forecast"):
+        fcst_df, plot_df = cached_forecast(get_session_key(), target_y, method, int(horizon), int(window), int(season))
+except ValueError as e:
+    st.error(f"Forecast gagal: {e}")
+    st.stop()
 
 # ================ VISUAL =================
 left, right = st.columns([2, 1], gap="small")
 
 with left:
     with st.expander("📈 Forecast Plot", expanded=True):
-        fig = px.line(
-            plot_df,
-            x=date_col,
-            y=target_y,
-            color="Phase",
-            markers=True,
-            title=f"Forecast {target_y} – {method} (+{horizon})"
-        )
+        px = timed_import("plotly.express")  # plotly diimport saat grafik pertama dibuat
+        with stage("figure:forecast"):
+            fig = px.line(
+                plot_df,
+                x=date_col,
+                y=target_y,
+                color="Phase",
+                markers=True,
+                title=f"Forecast {target_y} – {method} (+{horizon})"
+            )
         # gaya forecast: garis putus-putus
         # for i, tr in enumerate(fig.data):
         #     if tr.name == "Forecast":
@@ -144,16 +108,65 @@ with left:
         #     legend_title="Keterangan",
         #     xaxis=dict(tickangle=-30)
         # )
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, "forecast", use_container_width=True)
 
 with right:
     with st.expander("📋 Tabel Forecast", expanded=True):
-        st.dataframe(
-            fcst_df.rename(columns={date_col: "Tanggal", target_y: "Prediksi"})
-        )
-        # Download CSV
-        csv = fcst_df.rename(columns={date_col: "Tanggal", target_y: "Prediksi"}).to_csv(index=False).encode("utf-8")
-        st.download_button("⬇️ Unduh Forecast (CSV)", data=csv, file_name=f"forecast_{target_y}.csv", mime="text/csv")
+        fcst_table = fcst_df.rename(columns={date_col: "Tanggal", target_y: "Prediksi"})
+        st.dataframe(fcst_table)
+        # Download (CSV/Parquet/Excel)
+        export_panel(fcst_table, "export_forecast", f"forecast_{target_y}",
+                     version=(get_session_key(), target_y, method, int(horizon), int(window), int(season)))
 
 
 st.divider()
+
+# ================ BATCH FORECAST =================
+with st.expander("📦 Batch Forecast (Semua Kolom)", expanded=False):
+    st.caption("Forecast semua kolom numerik sekaligus dengan metode, horizon, dan window di atas.")
+    batch_cols = st.multiselect("Kolom", num_cols, default=num_cols, key="batch_cols")
+    if st.button("▶️ Jalankan Batch Forecast", disabled=not batch_cols):
+        with st.spinner("Menghitung forecast semua kolom…"), stage("batch_forecast"):
+            st.session_state["batch_forecast"] = {
+                "key": get_session_key(),
+                "method": method,
+                "table": forecast_all(df, batch_cols, method, int(horizon), int(window), int(season)),
+            }
+
+    batch = st.session_state.get("batch_forecast")
+    if batch is not None and batch["key"] == get_session_key():
+        st.caption(f"Metode: **{batch['method']}** · {batch['table'].shape[1] - 1:,} kolom")
+        st.dataframe(batch["table"], use_container_width=True, hide_index=True)
+        export_panel(batch["table"], "export_batch_forecast", "forecast_batch")
+
+# ================ BACKTEST =================
+with st.expander("🧪 Backtest (Rolling-Origin)", expanded=False):
+    st.caption("Uji semua metode pada banyak titik potong (cutoff) historis: latih pada data sebelum cutoff, "
+               "bandingkan prediksi dengan data aktual sampai horizon yang dipilih. Holt/Holt-Winters memakai "
+               "parameter dari data sebelum cutoff pertama; state-nya dimajukan sampai tiap cutoff.")
+    b1, b2 = st.columns([2, 1])
+    with b1:
+        bt_cols = st.multiselect("Kolom yang diuji", num_cols, default=[target_y])
+    with b2:
+        n_cutoffs = st.slider("Jumlah cutoff", min_value=10, max_value=500, value=100, step=10)
+
+    if st.button("▶️ Jalankan Backtest", disabled=not bt_cols):
+        series = {col: history(df, col)[col] for col in bt_cols}
+        with st.spinner("Menjalankan backtest…"), stage("backtest"):
+            st.session_state["backtest"] = {
+                "key": get_session_key(),
+                "detail": backtest_many(series, horizon, window, n_cutoffs, int(season)),
+            }
+
+    bt = st.session_state.get("backtest")
+    if bt is not None and bt["key"] == get_session_key():
+        detail = bt["detail"]
+        if detail.empty:
+            st.info("Data terlalu pendek untuk backtest dengan horizon ini.")
+        else:
+            st.markdown("**🏆 Leaderboard** (rata-rata semua horizon, urut RMSE)")
+            st.dataframe(leaderboard(detail), use_container_width=True, hide_index=True)
+            px = timed_import("plotly.express")
+            fig_bt = px.line(detail, x="Horizon", y="RMSE", color="Metode", line_dash="Kolom",
+                             template="plotly_dark", title="RMSE per Horizon")
+            plotly_chart(fig_bt, "backtest", use_container_width=True)
@@ -0,0 +1,149 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.timeindex import has_time_index, slice_range
+
+# ====== Konfigurasi analitik semua kolom ======
+# periode return: "" = per observasi (baris), selain itu frekuensi resample pandas
+PERIODS = {"": "Per observasi", "W": "Mingguan", "ME": "Bulanan", "QE": "Kuartalan"}
+DEFAULT_WINDOW = 20
+# korelasi pasangan kolom butuh minimal sekian observasi bersama
+MIN_PAIR_OBS = 3
+
+
+def value_matrix(df: pd.DataFrame, cols, start=None, end=None, period: str = ""):
+    """(tanggal, Y) untuk rentang start..end; Y = matriks float64 n × k (NaN = kosong).
+
+    period diisi → nilai terakhir tiap periode (mis. kurs akhir bulan).
+    """
+    sub = slice_range(df, start, end)
+    if period and has_time_index(sub):
+        sub = sub[list(cols)].resample(period).last()
+        return sub.index, sub.to_numpy(dtype=np.float64, na_value=np.nan)
+    dates = sub.index if has_time_index(sub) else pd.RangeIndex(len(sub))
+    return dates, sub[list(cols)].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _center(Y: np.ndarray) -> np.ndarray:
+    # rata-rata kolom (0 untuk kolom kosong); data dipusatkan dulu agar
+    # E[xy] - E[x]E[y] tidak kehilangan presisi pada nilai besar (mis. kurs)
+    if not len(Y):
+        return np.zeros(Y.shape[1])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nan_to_num(np.nanmean(Y, axis=0))
+
+
+def returns(Y: np.ndarray) -> np.ndarray:
+    """Return sederhana per langkah (y_t / y_{t-1} - 1); baris pertama & pasangan berisi NaN → NaN."""
+    R = np.full_like(Y, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        R[1:] = Y[1:] / Y[:-1] - 1.0
+    R[~np.isfinite(R)] = np.nan
+    return R
+
+
+def pairwise_corr(Y: np.ndarray, min_obs: int = MIN_PAIR_OBS):
+    """Korelasi Pearson semua pasangan kolom, tiap pasangan memakai baris yang terisi di keduanya.
+
+    Sama dengan DataFrame.corr() (pairwise complete), tetapi lewat beberapa perkalian
+    matriks bermask alih-alih loop per pasangan. Return (korelasi k×k, jumlah observasi k×k).
+    """
+    mask = ~np.isnan(Y)
+    M = mask.astype(np.float64)
+    X = np.where(mask, Y - _center(Y), 0.0)
+
+    n = M.T @ M                 # n[i, j]  = baris terisi di i dan j
+    sx = X.T @ M                # sx[i, j] = Σ x_i pada baris bersama (i, j)
+    sxx = (X * X).T @ M         # sxx[i, j] = Σ x_i² pada baris bersama
+    sxy = X.T @ X               # Σ x_i x_j (nol otomatis bila salah satu kosong)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_i, mean_j = sx / n, sx.T / n
+        cov = sxy / n - mean_i * mean_j
+        var_i = sxx / n - mean_i ** 2
+        var_j = var_i.T
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[(n < min_obs) | ~np.isfinite(corr)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr, n.astype(np.int64)
+
+
+def rolling_mean_std(Y: np.ndarray, window: int):
+    """Rata-rata & simpangan baku (ddof=1) bergulir semua kolom lewat cumulative sum.
+
+    Jendela = `window` baris terakhir; hasil NaN bila jendela memuat nilai kosong
+    (sama dengan rolling(window) pandas, min_periods = window).
+    """
+    n, k = Y.shape
+    mean, std = np.full((n, k), np.nan), np.full((n, k), np.nan)
+    if window < 2 or n < window:
+        return mean, std
+    mask = ~np.isnan(Y)
+    center = _center(Y)
+    X = np.where(mask, Y - center, 0.0)
+
+    def window_sum(A):
+        # c[t] = Σ A[:t] → jumlah jendela yang berakhir di baris t = c[t+1] - c[t+1-window]
+        c = np.zeros((n + 1, k))
+        np.cumsum(A, axis=0, out=c[1:])
+        return c[window:] - c[:-window]
+
+    full = window_sum(mask.astype(np.float64)) >= window
+    s, ss = window_sum(X), window_sum(X * X)
+    with np.errstate(invalid="ignore"):
+        mean[window - 1:] = np.where(full, s / window + center, np.nan)
+        std[window - 1:] = np.where(full, np.sqrt(np.maximum(ss - s * s / window, 0.0) / (window - 1)), np.nan)
+    return mean, std
+
+
+def _edge_values(A: np.ndarray, last: bool) -> np.ndarray:
+    # nilai terisi pertama/terakhir per kolom (NaN jika kolom kosong)
+    ok = ~np.isnan(A)
+    if not len(A):
+        return np.full(A.shape[1], np.nan)
+    pos = len(A) - 1 - ok[::-1].argmax(axis=0) if last else ok.argmax(axis=0)
+    return np.where(ok.any(axis=0), A[pos, np.arange(A.shape[1])], np.nan)
+
+
+class RangeAnalytics:
+    """Hasil analitik semua kolom untuk satu (rentang, periode, jendela).
+
+    - corr: korelasi antar kolom (dari return, atau dari nilai jika basis="value"), DataFrame k×k
+    - summary: satu baris per kolom (return periode, volatilitas, rolling terakhir, …)
+    """
+
+    def __init__(self, df: pd.DataFrame, cols, start=None, end=None, window: int = DEFAULT_WINDOW,
+                 period: str = "", basis: str = "return"):
+        cols = list(cols)
+        self.window, self.period, self.basis = window, period, basis
+        _, Y = value_matrix(df, cols, start, end, period)
+        R = returns(Y)
+        corr, _ = pairwise_corr(R if basis == "return" else Y)
+        self.corr = pd.DataFrame(corr, index=cols, columns=cols)
+
+        roll_mean, _ = rolling_mean_std(Y, window)
+        _, roll_vol = rolling_mean_std(R, window)
+        first, last = _edge_values(Y, last=False), _edge_values(Y, last=True)
+        others = np.isfinite(corr).sum(axis=1) - 1  # pasangan valid selain diri sendiri
+        with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)  # kolom tanpa data → NaN, bukan peringatan
+            self.summary = pd.DataFrame({
+                "Kolom": cols,
+                "Observasi": (~np.isnan(Y)).sum(axis=0),
+                "Awal": first,
+                "Akhir": last,
+                "Return periode (%)": (last / first - 1.0) * 100,
+                "Rata-rata return (%)": np.nanmean(R, axis=0) * 100,
+                "Volatilitas (%)": np.nanstd(R, axis=0, ddof=1) * 100,
+                f"Rolling mean ({window})": _edge_values(roll_mean, last=True),
+                f"Rolling vol ({window}, %)": _edge_values(roll_vol, last=True) * 100,
+                f"Rolling vol maks ({window}, %)": (np.nanmax(roll_vol, axis=0) if len(R) else first) * 100,
+                "Korelasi |r| rata-rata": np.where(
+                    others > 0, (np.nansum(np.abs(corr), axis=1) - 1.0) / np.maximum(others, 1), np.nan),
+            }).replace([np.inf, -np.inf], np.nan)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.corr.memory_usage().sum() + self.summary.memory_usage(deep=True).sum())
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.forecast import METHODS
+from utils.smoothing import SMOOTHING_METHODS, fit
+
+# jumlah titik latih minimal sebelum cutoff pertama
+MIN_TRAIN = 10
+MAX_WORKERS = int(os.environ.get("BACKTEST_MAX_WORKERS", os.cpu_count() or 1))
+
+
+def rolling_origin_predictions(y: np.ndarray, cutoffs: np.ndarray, horizon: int, window: int) -> dict:
+    """Prediksi semua metode untuk semua cutoff sekaligus (matriks cutoff × horizon).
+
+    Data latih cutoff c adalah y[:c]; rumus tiap metode sama dengan fungsi di
+    utils.forecast, tetapi dihitung dari prefix-sum sehingga tanpa loop per cutoff.
+    """
+    c = cutoffs.astype(np.float64)[:, None]
+    steps = np.arange(horizon)[None, :]
+    x = np.arange(len(y), dtype=np.float64)
+    cs_y = np.concatenate([[0.0], np.cumsum(y)])
+    cs_xy = np.concatenate([[0.0], np.cumsum(x * y)])
+
+    # Linear Trend: polyfit derajat 1 pada x = 0..c-1 (closed-form)
+    sy, sxy = cs_y[cutoffs][:, None], cs_xy[cutoffs][:, None]
+    sx = c * (c - 1) / 2
+    sxx = (c - 1) * c * (2 * c - 1) / 6
+    slope = (c * sxy - sx * sy) / (c * sxx - sx * sx)
+    intercept = (sy - slope * sx) / c
+    linear = slope * (c + steps) + intercept
+
+    # Naive: nilai terakhir sebelum cutoff
+    naive = np.repeat(y[cutoffs - 1][:, None], horizon, axis=1)
+
+    # Rata-rata (Window): mean window terakhir (min_periods=1)
+    lo = np.maximum(cutoffs - window, 0)
+    rolling = ((cs_y[cutoffs] - cs_y[lo]) / (cutoffs - lo))[:, None]
+    rolling = np.repeat(rolling, horizon, axis=1)
+
+    return dict(zip(METHODS, [linear, naive, rolling]))
+
+
+def smoothing_predictions(y: np.ndarray, cutoffs: np.ndarray, horizon: int, season: int) -> dict:
+    """Prediksi Holt / Holt-Winters untuk semua cutoff dalam satu pass.
+
+    Parameter di-fit sekali pada data sebelum cutoff pertama yang cukup panjang
+    (Holt-Winters butuh 2 × musim); state lalu dimajukan sampai tiap cutoff berikutnya
+    tanpa fitting ulang dan tanpa melihat data sesudah cutoff. Cutoff yang terlalu
+    awal berisi NaN; metode tanpa cutoff yang cukup panjang dilewati.
+    """
+    out = {}
+    for method, m in zip(SMOOTHING_METHODS, (0, season)):
+        first = int(np.searchsorted(cutoffs, 2 * m if m else 2))
+        if first >= len(cutoffs):
+            continue
+        state = fit(y[:cutoffs[first]], m)
+        pred = np.full((len(cutoffs), horizon), np.nan)
+        pos = cutoffs[first]
+        for i in range(first, len(cutoffs)):
+            state.advance(y[pos:cutoffs[i]])
+            pos = cutoffs[i]
+            pred[i] = state.forecast(horizon)
+        out[method] = pred
+    return out
+
+
+def backtest_series(name, y, horizon: int, window: int, n_cutoffs: int = 100, season: int = 7) -> pd.DataFrame:
+    """Backtest rolling-origin satu seri; metrik per (metode, horizon) untuk semua metode."""
+    y = np.asarray(y, dtype=np.float64)
+    last = len(y) - horizon
+    if last < max(MIN_TRAIN, 2):
+        return pd.DataFrame()
+    cutoffs = np.unique(np.linspace(max(MIN_TRAIN, 2), last, min(n_cutoffs, last)).astype(np.int64))
+    actual = y[cutoffs[:, None] + np.arange(horizon)[None, :]]
+    abs_actual = np.where(actual != 0, np.abs(actual), np.nan)
+
+    rows = []
+    predictions = {**rolling_origin_predictions(y, cutoffs, horizon, window),
+                   **smoothing_predictions(y, cutoffs, horizon, season)}
+    for method, pred in predictions.items():
+        # cutoff tanpa prediksi (NaN, lihat smoothing_predictions) tidak ikut dirata-rata
+        valid = np.isfinite(pred[:, 0])
+        err = pred[valid] - actual[valid]
+        rows.append(pd.DataFrame({
+            "Kolom": name,
+            "Metode": method,
+            "Horizon": np.arange(1, horizon + 1),
+            "MAE": np.abs(err).mean(axis=0),
+            "RMSE": np.sqrt((err * err).mean(axis=0)),
+            "MAPE (%)": np.nanmean(np.abs(err) / abs_actual[valid], axis=0) * 100,
+            "Cutoff": int(valid.sum()),
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _run(args):
+    return backtest_series(*args)
+
+
+def backtest_many(series: dict, horizon: int, window: int, n_cutoffs: int = 100, season: int = 7,
+                  max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """Backtest beberapa seri; lebih dari satu seri dibagi ke process pool."""
+    tasks = [(name, np.asarray(y, dtype=np.float64), horizon, window, n_cutoffs, season)
+             for name, y in series.items()]
+    workers = min(max_workers, len(tasks))
+    if workers <= 1:
+        results = [_run(t) for t in tasks]
+    else:
+        # spawn: aman dipakai dari server Streamlit yang multi-thread
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(_run, tasks))
+    results = [r for r in results if not r.empty]
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+
+def leaderboard(detail: pd.DataFrame) -> pd.DataFrame:
+    """Ringkasan per (kolom, metode) dirata-rata atas semua horizon, diurutkan per RMSE."""
+    if detail.empty:
+        return detail
+    board = detail.groupby(["Kolom", "Metode"], as_index=False)[["MAE", "RMSE", "MAPE (%)"]].mean()
+    board = board.sort_values(["Kolom", "RMSE"])
+    board.insert(0, "Peringkat", board.groupby("Kolom").cumcount() + 1)
+    return board.reset_index(drop=True)
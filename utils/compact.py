@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# kolom teks dengan rasio nilai unik <= ini diubah ke category
+CATEGORY_MAX_RATIO = 0.5
+# tipe integer terkecil hasil downcast
+INT_MIN_DTYPE = np.int32
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """Ukuran DataFrame di memori (termasuk isi string)."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _downcast_int(s: pd.Series) -> pd.Series:
+    # int64 → int32 bila muat; tidak lebih kecil lagi, karena aritmetika pandas pada
+    # int8/int16 overflow diam-diam (mis. int8 127 * 2 = -2)
+    if s.dtype.itemsize <= np.dtype(INT_MIN_DTYPE).itemsize:
+        return s
+    info = np.iinfo(INT_MIN_DTYPE)
+    lo, hi = s.min(), s.max()
+    if pd.isna(lo) or (info.min <= lo and hi <= info.max):
+        nullable = isinstance(s.dtype, pd.api.extensions.ExtensionDtype)
+        return s.astype(pd.Int32Dtype() if nullable else INT_MIN_DTYPE)
+    return s
+
+
+def _downcast_numeric(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return _downcast_int(s)
+    if pd.api.types.is_float_dtype(s):
+        values = s.to_numpy()
+        # float bernilai bulat tetap float: dijadikan integer akan mengubah hasil pembagian & overflow
+        # float32 hanya jika tidak ada presisi yang hilang
+        as_f32 = values.astype(np.float32)
+        if np.array_equal(as_f32.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(as_f32, index=s.index, name=s.name)
+    return s
+
+
+def compact_dtypes(df: pd.DataFrame):
+    """Perkecil tipe data tanpa kehilangan nilai.
+
+    - integer di-downcast sampai int32, float ke float32, keduanya hanya bila lossless
+    - teks berulang (kardinalitas rendah) → category
+
+    Return (df_baru, laporan) dengan laporan = {"before": bytes, "after": bytes}.
+    """
+    before = memory_bytes(df)
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_numeric_dtype(s):
+            s = _downcast_numeric(s)
+        elif s.dtype == object and len(s) and s.nunique(dropna=True) / len(s) <= CATEGORY_MAX_RATIO:
+            s = s.astype("category")
+        out[col] = s
+    compact = pd.DataFrame(out, index=df.index)
+    return compact, {"before": before, "after": memory_bytes(compact)}
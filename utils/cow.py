@@ -0,0 +1,11 @@
+def enable_copy_on_write():
+    """Aktifkan Copy-on-Write pandas untuk seluruh proses; aman dipanggil berkali-kali.
+
+    Registry membagikan salinan dangkal (copy(deep=False)) dataset ke tiap sesi; dengan
+    CoW salinan itu tidak bisa mengubah data milik registry maupun sesi lain. CLI batch
+    memakai mode yang sama agar hasilnya identik dengan halaman. pandas diimport di sini
+    (bukan di level modul) agar halaman tanpa dataset tidak ikut memuatnya.
+    """
+    import pandas as pd
+
+    pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+# ====== Konfigurasi cache dataset (Arrow/Feather di disk lokal) ======
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache")
+CACHE_DIR = os.path.join(CACHE_ROOT, "datasets")
+USER_DIR = os.path.join(CACHE_ROOT, "users")
+MAX_CACHE_BYTES = int(os.environ.get("DATASET_CACHE_MAX_BYTES", 1024 * 1024 * 1024))  # default 1 GB
+# naikkan jika bentuk dataset hasil ingest berubah, agar file cache lama tidak terpakai
+CACHE_VERSION = 8
+CACHE_EXT = ".arrow"
+# kunci metadata skema Arrow untuk info milik aplikasi (mis. hasil inferensi tipe)
+META_KEY = b"app_meta"
+
+
+def content_hash(data: bytes) -> str:
+    """Hash isi file (bukan nama file) sebagai kunci dataset."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.v{CACHE_VERSION}{CACHE_EXT}")
+
+
+def _write_arrow(df: pd.DataFrame, path: str, meta: dict = None):
+    """Tulis Feather V2 (Arrow IPC) tanpa kompresi secara atomic, agar bisa di-memory-map.
+
+    meta (dict JSON) ikut disimpan di metadata skema file.
+    """
+    import pyarrow as pa
+    from pyarrow import feather
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        if meta is not None:
+            table = table.replace_schema_metadata({**table.schema.metadata,
+                                                   META_KEY: json.dumps(meta, default=str).encode("utf-8")})
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)  # atomic: pembaca tidak pernah melihat file setengah jadi
+    finally:
+        _remove(tmp_path)
+
+
+def _read_arrow(path: str) -> pd.DataFrame:
+    """Baca file Arrow lewat memory map: kolom numerik tanpa nilai kosong tidak disalin ke RAM."""
+    import pyarrow as pa
+
+    # mmap tetap hidup selama buffer tabel/DataFrame masih dipakai
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def load_cached(key: str):
+    """Baca dataset dari cache (memory-mapped); None jika belum ada."""
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = _read_arrow(path)
+    except Exception:
+        # file cache rusak/terpotong: buang saja, nanti di-parse ulang
+        _remove(path)
+        return None
+    # sentuh mtime agar dianggap "baru dipakai" (dasar LRU)
+    os.utime(path, None)
+    return df
+
+
+def load_meta(key: str):
+    """Metadata aplikasi dataset di cache (hanya header skema yang dibaca); None jika tidak ada."""
+    import pyarrow as pa
+
+    try:
+        metadata = pa.ipc.open_file(pa.memory_map(_cache_path(key), "r")).schema.metadata or {}
+        return json.loads(metadata[META_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid):
+        return None
+
+
+def has_cached(key: str) -> bool:
+    return os.path.exists(_cache_path(key))
+
+
+def save_cached(key: str, df: pd.DataFrame, meta: dict = None) -> bool:
+    """Simpan dataset (dan metadata aplikasi, jika ada) ke cache Arrow lalu jalankan eviksi LRU."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    try:
+        _write_arrow(df, _cache_path(key), meta)
+    except Exception:
+        # mis. kolom object campuran yang tidak bisa dikonversi ke Arrow → cache dilewati
+        return False
+    evict(MAX_CACHE_BYTES)
+    return True
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES):
+    """Hapus file cache yang paling lama tidak dipakai sampai total <= max_bytes."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(CACHE_EXT):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            st_ = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((st_.st_mtime, st_.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+# ====== Dataset terakhir per user ======
+def _user_paths(username: str):
+    # nama file dari hash username: aman dari karakter path
+    uid = hashlib.blake2b(username.encode("utf-8"), digest_size=8).hexdigest()
+    base = os.path.join(USER_DIR, f"{uid}.v{CACHE_VERSION}")
+    return base + CACHE_EXT, base + ".json"
+
+
+def save_user_dataset(username: str, key: str, df: pd.DataFrame = None) -> bool:
+    """Catat dataset aktif milik user agar bisa dipulihkan setelah refresh/reconnect.
+
+    File dataset user adalah hardlink ke file cache (tanpa salinan), sehingga
+    tidak ikut terhapus oleh eviksi cache. Jika cache tidak ada, df ditulis langsung.
+    """
+    os.makedirs(USER_DIR, exist_ok=True)
+    data_path, meta_path = _user_paths(username)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f).get("key") == key and os.path.exists(data_path):
+                return True
+    except (OSError, ValueError):
+        pass
+    tmp_path = f"{data_path}.{os.getpid()}.tmp"
+    try:
+        if has_cached(key):
+            _remove(tmp_path)
+            try:
+                os.link(_cache_path(key), tmp_path)
+            except OSError:
+                shutil.copyfile(_cache_path(key), tmp_path)
+            os.replace(tmp_path, data_path)
+        elif df is not None:
+            _write_arrow(df, data_path)
+        else:
+            return False
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"key": key}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except Exception:
+        _remove(tmp_path)
+        return False
+    return True
+
+
+def load_user_dataset(username: str):
+    """(key, df) dataset terakhir milik user (memory-mapped), atau None."""
+    data_path, meta_path = _user_paths(username)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            key = json.load(f)["key"]
+        return key, _read_arrow(data_path)
+    except Exception:
+        return None
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# kurang lebih lebar plot dalam piksel: lebih dari ini tidak terlihat bedanya
+MAX_POINTS = 1500
+# di atas jumlah titik ini grafik garis memakai trace WebGL (scattergl)
+WEBGL_THRESHOLD = 5000
+
+
+def _as_float(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[ns]").astype(np.int64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: pilih n_out titik yang menjaga bentuk kurva."""
+    x, y = _as_float(x), _as_float(y)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # titik pertama & terakhir selalu dipakai; sisanya dibagi ke n_out-2 bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_buckets: int) -> np.ndarray:
+    """Indeks nilai min & maks tiap bucket (menjaga puncak/lembah, cocok untuk bar)."""
+    y = _as_float(y)
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+    bucket = (np.arange(n) * n_buckets) // n
+    order = np.lexsort((y, bucket))  # urut per bucket lalu per nilai
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets), side="left")
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def decimate(df: pd.DataFrame, x_col, y_cols, n_out: int = MAX_POINTS, method: str = "lttb") -> pd.DataFrame:
+    """Kurangi baris df per seri (y_cols) ke ±n_out titik; gabungan indeks semua seri."""
+    if len(df) <= n_out:
+        return df
+    x = df[x_col].to_numpy()
+    keep = []
+    for col in y_cols:
+        y = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(y))
+        if method == "minmax":
+            idx = minmax_indices(y[valid], n_out // 2)
+        else:
+            idx = lttb_indices(x[valid], y[valid], n_out)
+        keep.append(valid[idx])
+    rows = np.unique(np.concatenate(keep)) if keep else np.arange(0)
+    return df.iloc[rows]
+
+
+def use_webgl(n_points: int) -> bool:
+    return n_points > WEBGL_THRESHOLD
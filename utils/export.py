@@ -0,0 +1,232 @@
+import os
+import time
+import uuid
+
+import pandas as pd
+
+from utils.dataset_cache import CACHE_ROOT
+from utils.perf import stage
+
+# ====== Konfigurasi export ======
+EXPORT_DIR = os.path.join(CACHE_ROOT, "exports")
+EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", 100_000))
+# file export dihapus setelah sekian detik (dibersihkan saat export berikutnya)
+EXPORT_MAX_AGE_SECONDS = int(os.environ.get("EXPORT_MAX_AGE_SECONDS", 3600))
+PARQUET_COMPRESSION = os.environ.get("EXPORT_PARQUET_COMPRESSION", "zstd")
+# hasil kecil (tabel forecast, ringkasan) disiapkan otomatis tanpa tombol
+EXPORT_AUTO_ROWS = 10_000
+# di atas ini Parquet jadi format default (terkompresi, jauh lebih kecil untuk diunduh)
+LARGE_EXPORT_ROWS = 200_000
+# st.download_button membaca seluruh file ke RAM (media file manager) di tiap rerun yang
+# menampilkannya → file di atas ukuran ini hanya ditawarkan di rerun yang menyiapkannya
+EXPORT_INLINE_BYTES = int(os.environ.get("EXPORT_INLINE_BYTES", 16 * 1024 * 1024))
+# batas baris per sheet Excel (termasuk header); sisanya lanjut ke sheet berikutnya
+XLSX_SHEET_ROWS = 1_048_576
+FORMATS = {
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def iter_chunks(df: pd.DataFrame, lo: int = 0, hi: int = None, columns=None, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Potongan df[lo:hi] (posisi baris, mis. dari range_positions) berukuran chunk_rows.
+
+    Tiap potongan adalah slice posisi; rentang penuh tidak pernah disalin sekaligus.
+    Rentang kosong tetap menghasilkan satu potongan kosong agar header ikut tertulis.
+    """
+    hi = len(df) if hi is None else hi
+    cols = list(df.columns) if columns is None else list(columns)
+    if hi <= lo:
+        yield df.iloc[0:0][cols]
+        return
+    for start in range(lo, hi, chunk_rows):
+        yield df.iloc[start:min(start + chunk_rows, hi)][cols]
+
+
+def _arrow_table(chunk: pd.DataFrame):
+    import pyarrow as pa
+
+    chunk = chunk.set_axis(chunk.columns.astype(str), axis=1)  # Arrow/Parquet butuh nama kolom string
+    return pa.Table.from_pandas(chunk, preserve_index=False)
+
+
+def _fixed_schema(table):
+    import pyarrow as pa
+
+    # kolom teks yang kosong semua di potongan pertama terbaca bertipe null
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+
+def write_csv(chunks, path: str):
+    """CSV lewat writer Arrow (C++), jauh lebih cepat dari DataFrame.to_csv per potongan."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            table = _arrow_table(chunk)
+            for i, field in enumerate(table.schema):
+                if pa.types.is_timestamp(field.type):
+                    # seperti to_csv pandas: tanpa jam jika semuanya tengah malam; presisi sampai detik
+                    s = chunk.iloc[:, i]
+                    fmt = "%Y-%m-%d" if (s.isna() | (s == s.dt.normalize())).all() else "%Y-%m-%d %H:%M:%S"
+                    seconds = pc.cast(table.column(i), pa.timestamp("s", field.type.tz), safe=False)
+                    table = table.set_column(i, field.name, pc.strftime(seconds, format=fmt))
+            if writer is None:
+                schema = _fixed_schema(table)
+                writer = pa_csv.CSVWriter(path, schema, write_options=pa_csv.WriteOptions(quoting_style="needed"))
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_parquet(chunks, path: str, compression: str = PARQUET_COMPRESSION):
+    """Satu row group per potongan; skema diambil dari potongan pertama."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            table = _arrow_table(chunk)
+            if schema is None:
+                schema = _fixed_schema(table)
+                # dictionary encoding hanya berguna untuk teks/kategori; pada angka acak cuma
+                # memperlambat dan memperbesar file. Tanggal terurut → delta encoding.
+                text = [f.name for f in schema if pa.types.is_string(f.type) or pa.types.is_large_string(f.type)
+                        or pa.types.is_dictionary(f.type)]
+                deltas = {f.name: "DELTA_BINARY_PACKED" for f in schema if pa.types.is_timestamp(f.type)}
+                writer = pq.ParquetWriter(path, schema, compression=compression, use_dictionary=text,
+                                          column_encoding=deltas or None)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_xlsx(chunks, path: str, sheet_name: str = "Data"):
+    """Workbook write-only openpyxl: baris langsung dialirkan ke file sementara, bukan ditahan di memori."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws, rows, sheets, header = None, 0, 0, None
+    for chunk in chunks:
+        header = [str(c) for c in chunk.columns]
+        # NaN/NaT → sel kosong
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if ws is None or rows >= XLSX_SHEET_ROWS:
+                sheets += 1
+                ws = wb.create_sheet(sheet_name if sheets == 1 else f"{sheet_name} ({sheets})")
+                ws.append(header)
+                rows = 1
+            ws.append(row)
+            rows += 1
+    if ws is None:
+        wb.create_sheet(sheet_name).append(header or [])
+    wb.save(path)
+
+
+_WRITERS = {"csv": write_csv, "parquet": write_parquet, "xlsx": write_xlsx}
+
+
+def cleanup_exports(max_age: int = EXPORT_MAX_AGE_SECONDS):
+    """Hapus file export yang lebih tua dari max_age detik."""
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def write_frame(df: pd.DataFrame, path: str, fmt: str, lo: int = 0, hi: int = None, columns=None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Tulis df[lo:hi] ke path per potongan (atomic: file sementara lalu rename).
+
+    Memori tambahan sebanding dengan chunk_rows, bukan jumlah baris yang ditulis.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Format export '{fmt}' tidak dikenal.")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        _WRITERS[fmt](iter_chunks(df, lo, hi, columns, chunk_rows), tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export_file(df: pd.DataFrame, fmt: str, lo: int = 0, hi: int = None, columns=None) -> str:
+    """write_frame ke file baru di EXPORT_DIR; return path-nya."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cleanup_exports()
+    path = os.path.join(EXPORT_DIR, f"{uuid.uuid4().hex}.{fmt}")
+    write_frame(df, path, fmt, lo, hi, columns)
+    return path
+
+
+def export_panel(df: pd.DataFrame, widget_key: str, file_name: str, lo: int = 0, hi: int = None,
+                 columns=None, version=None):
+    """Pilih format → siapkan file di disk → tombol unduh.
+
+    version menandai isi df (mis. key dataset atau parameter forecast); default id(df),
+    cocok untuk frame yang disimpan di session/registry. File yang sudah disiapkan
+    dipakai lagi selama version, rentang, kolom, dan format sama.
+
+    Tombol unduh memuat isi file ke memori server sampai rerun berikutnya, jadi file
+    besar (> EXPORT_INLINE_BYTES) hanya ditawarkan di rerun tempat tombol "Siapkan"
+    diklik; rerun lain tidak membaca file itu lagi.
+    """
+    import streamlit as st
+
+    hi = len(df) if hi is None else hi
+    n = max(hi - lo, 0)
+    formats = list(FORMATS)
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        fmt = st.selectbox("Format", formats, index=formats.index("parquet" if n > LARGE_EXPORT_ROWS else "csv"),
+                           format_func=lambda f: FORMATS[f][0], key=f"{widget_key}_fmt")
+    label, mime = FORMATS[fmt]
+    cols = tuple(df.columns if columns is None else columns)
+    signature = (version if version is not None else id(df), fmt, lo, hi, cols)
+
+    state = st.session_state.get(widget_key)
+    ready = state is not None and state["signature"] == signature and os.path.exists(state["path"])
+    with c2:
+        # hasil kecil disiapkan otomatis; selain itu lewat tombol (file yang sudah ada dipakai lagi)
+        requested = n <= EXPORT_AUTO_ROWS
+        if not requested:
+            requested = st.button(f"📦 Siapkan file {label} ({n:,} baris)", key=f"{widget_key}_build")
+            if fmt == "xlsx" and n > LARGE_EXPORT_ROWS:
+                st.caption("Excel lambat untuk data besar; Parquet/CSV jauh lebih cepat.")
+        if requested and not ready:
+            with st.spinner(f"Menulis {n:,} baris ke {label}…"), stage(f"export:{fmt}"):
+                path = export_file(df, fmt, lo, hi, cols)
+            if state is not None and os.path.exists(state["path"]):
+                os.remove(state["path"])  # file lama sesi ini tidak dipakai lagi
+            st.session_state[widget_key] = state = {"signature": signature, "path": path}
+            ready = True
+        if not ready:
+            return
+        size = os.path.getsize(state["path"])
+        size_text = f"{size / 1024**2:,.1f} MB" if size >= 1024**2 else f"{size / 1024:,.1f} KB"
+        if requested or size <= EXPORT_INLINE_BYTES:
+            with open(state["path"], "rb") as f:
+                st.download_button(f"⬇️ Unduh {label} ({size_text})", data=f,
+                                   file_name=f"{file_name}.{fmt}", mime=mime, key=f"{widget_key}_download",
+                                   on_click="ignore")
+        else:
+            st.caption(f"File {label} ({size_text}) sudah siap; klik tombol di atas untuk menampilkan unduhan.")
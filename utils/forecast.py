@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+# label metode sesuai pilihan di halaman Forecasting
+METHODS = ["Linear Trend (Sederhana)", "Naive (Last Value)", "Rata-rata (Window)"]
+
+
+def history(df: pd.DataFrame, target) -> pd.DataFrame:
+    """Riwayat target untuk forecast: (tanggal, nilai) terisi, satu baris per tanggal."""
+    date_col = df.columns[0]
+    # dataset sudah terurut menurut tanggal → tidak perlu sort ulang
+    work = df[[date_col, target]].dropna()
+    # pastikan tidak ada duplikat tanggal untuk plotting yang bersih
+    return work.drop_duplicates(subset=[date_col])
+
+
+def infer_step(dts: pd.Series) -> pd.Timedelta:
+    """Ambil step waktu dominan; fallback median diff jika tidak jelas."""
+    s = dts.sort_values().dropna().unique()
+    if len(s) < 2:
+        return pd.Timedelta(days=1)
+    diffs = pd.Series(s[1:] - s[:-1])
+    # gunakan modus diff jika ada; fallback median
+    try:
+        step = diffs.mode().iloc[0]
+    except Exception:
+        step = diffs.median()
+    # guard: jika step==0, fallback 1 hari
+    if step == pd.Timedelta(0):
+        step = pd.Timedelta(days=1)
+    return step
+
+
+def make_future_dates(last_dt: pd.Timestamp, step: pd.Timedelta, n: int) -> pd.DatetimeIndex:
+    return pd.date_range(start=last_dt + step, periods=n, freq=step)
+
+
+def linear_trend_forecast(x_dt: pd.Series, y: pd.Series, n: int):
+    """Linear regression sederhana pada indeks waktu (ordinal)."""
+    # gunakan index berbasis urutan agar robust
+    x_idx = np.arange(len(y))
+    # fit y = a*x + b
+    a, b = np.polyfit(x_idx, y.values.astype(float), 1)
+    x_future = np.arange(len(y), len(y) + n)
+    y_future = a * x_future + b
+    return y_future
+
+
+def naive_last_value(y: pd.Series, n: int):
+    return np.repeat(y.dropna().iloc[-1], n)
+
+
+def rolling_mean_forecast(y: pd.Series, n: int, window: int):
+    base = y.rolling(window=window, min_periods=1).mean().iloc[-1]
+    return np.repeat(float(base), n)
+
+
+def _aligned_matrix(df: pd.DataFrame, date_col, cols):
+    """Semua kolom disejajarkan pada index waktu bersama (tanggal unik, NaT dibuang)."""
+    frame = df[[date_col] + list(cols)]
+    frame = frame[frame[date_col].notna()]
+    frame = frame[~frame[date_col].duplicated()]
+    return frame[date_col], frame[list(cols)].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def batch_forecast(df: pd.DataFrame, date_col, cols, method: str, n: int, window: int = 7) -> pd.DataFrame:
+    """Forecast banyak kolom sekaligus; hasil tabel lebar (Tanggal + satu kolom per seri).
+
+    Tiap kolom memakai data valid (non-NaN) miliknya sendiri, seperti forecast
+    satu kolom: x = urutan data valid. Linear Trend untuk semua kolom
+    diselesaikan dengan satu batch least squares (persamaan normal 2×2 per kolom).
+    """
+    dates, Y = _aligned_matrix(df, date_col, cols)
+    mask = ~np.isnan(Y)
+    Y0 = np.where(mask, Y, 0.0)
+    counts = mask.sum(axis=0)
+    # posisi tiap nilai valid di antara nilai valid kolomnya (0, 1, 2, …)
+    order = np.cumsum(mask, axis=0) - 1
+    X0 = np.where(mask, order, 0).astype(np.float64)
+    steps = np.arange(n)[:, None]
+
+    if method == METHODS[0]:
+        A = np.empty((len(cols), 2, 2))
+        A[:, 0, 0] = (X0 * X0).sum(axis=0)
+        A[:, 0, 1] = A[:, 1, 0] = X0.sum(axis=0)
+        A[:, 1, 1] = counts
+        rhs = np.stack([(X0 * Y0).sum(axis=0), Y0.sum(axis=0)], axis=1)
+        coef = np.full((len(cols), 2), np.nan)
+        solvable = counts >= 2
+        if solvable.any():
+            coef[solvable] = np.linalg.solve(A[solvable], rhs[solvable][..., None])[..., 0]
+        y_hat = coef[:, 0] * (counts + steps) + coef[:, 1]
+    elif method == METHODS[1]:
+        # nilai valid terakhir per kolom
+        last_pos = np.where(counts > 0, Y.shape[0] - 1 - np.argmax(mask[::-1], axis=0), 0)
+        last = np.where(counts > 0, Y[last_pos, np.arange(len(cols))], np.nan)
+        y_hat = np.repeat(last[None, :], n, axis=0)
+    elif method == METHODS[2]:
+        in_window = mask & (order >= counts - window)
+        base = (Y0 * in_window).sum(axis=0) / np.maximum(in_window.sum(axis=0), 1)
+        base = np.where(counts > 0, base, np.nan)
+        y_hat = np.repeat(base[None, :], n, axis=0)
+    else:
+        raise ValueError(f"Metode '{method}' tidak didukung untuk batch forecast.")
+
+    step = infer_step(dates)
+    future = make_future_dates(dates.iloc[-1], step, n) if len(dates) else pd.DatetimeIndex([])
+    out = pd.DataFrame(y_hat, columns=list(cols))
+    out.insert(0, "Tanggal", future)
+    return out
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from utils.forecast import (
+    METHODS, history, linear_trend_forecast, make_future_dates, naive_last_value, rolling_mean_forecast,
+)
+from utils.ingest import dataset_step
+from utils.registry import REGISTRY
+from utils.smoothing import SMOOTHING_METHODS, SmoothingModel
+
+
+def _forecast(key: str, df: pd.DataFrame, target, method: str, horizon: int, window: int, season: int):
+    date_col = df.columns[0]
+    step = dataset_step(key, df)
+    work = history(df, target)
+    future_index = make_future_dates(work[date_col].iloc[-1], step, horizon)
+
+    if method == METHODS[0]:
+        y_hat = linear_trend_forecast(work[date_col], work[target], horizon)
+    elif method == METHODS[1]:
+        y_hat = naive_last_value(work[target], horizon)
+    elif method == METHODS[2]:
+        y_hat = rolling_mean_forecast(work[target], horizon, window)
+    else:
+        # Holt / Holt-Winters: state per (dataset, kolom, musim) di registry; append murni di
+        # akhir hanya memajukan state (SmoothingModel.extend), selain itu fitting ulang
+        m = season if method == SMOOTHING_METHODS[1] else 0
+        model = REGISTRY.derived(key, f"smoothing:{target}:{m}", lambda data: SmoothingModel(data, target, m))
+        y_hat = model.forecast(horizon)
+
+    fcst_df = pd.DataFrame({date_col: future_index, target: y_hat})
+    fcst_df["Phase"] = "Forecast"
+    return fcst_df
+
+
+def cached_forecast(key: str, target, method: str, horizon: int, window: int, season: int = 7):
+    """Forecast satu kolom, di-cache di registry per (dataset, target, metode, horizon, window, musim).
+
+    Return (fcst_df, plot_df). Hanya fcst_df (sepanjang horizon) yang disimpan sebagai
+    hasil dataset (REGISTRY.result, jumlahnya dibatasi LRU); plot_df (riwayat + forecast)
+    dibangun ulang tiap panggilan. Step waktu diambil dari metadata cache yang ditulis saat ingest.
+    """
+    df = REGISTRY.get(key)
+    fcst_df = REGISTRY.result(
+        key, f"forecast:{target}:{method}:{horizon}:{window}:{season}",
+        lambda data: _forecast(key, data, target, method, horizon, window, season),
+    ) if df is not None else None
+    if fcst_df is None:
+        raise ValueError("Dataset tidak ada di memori. Unggah ulang data di halaman 📘 Data Excel.")
+    plot_df = pd.concat([history(df, target).assign(Phase="History"), fcst_df], ignore_index=True)
+    return fcst_df, plot_df
@@ -0,0 +1,226 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# ====== Konfigurasi inferensi tipe ======
+# jumlah nilai (tersebar merata) yang diperiksa per kolom untuk menebak tipe & format
+SAMPLE_SIZE = 1000
+# minimal porsi sampel yang cocok agar kolom dikonversi
+INFER_MIN_MATCH = 0.9
+# konversi dibatalkan (kolom tetap teks) jika porsi gagal pada seluruh kolom melebihi ini
+MAX_FAIL_RATE = 0.5
+# kolom pertama (tanggal) sudah dianggap tanggal jika porsi sampel ini cocok; nilai yang
+# gagal dihitung & dilaporkan apply_schema seperti kolom lain
+DATE_COL_MIN_MATCH = 1 - MAX_FAIL_RATE
+# kolom tanggal dengan format campuran: paling banyak sekian format dicoba berurutan
+MAX_DATE_FORMATS = 3
+# urutan = prioritas saat sampel sama-sama cocok (mis. 03/04/2021 → 3 April, format Indonesia)
+DATE_FORMATS = [
+    "ISO8601", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d", "%d/%m/%y",
+    "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S",
+    "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y", "%b %Y", "%B %Y",
+]
+# angka sebagai teks: "id" = 1.234,56 (titik ribuan, koma desimal), "en" = 1,234.56
+NUMBER_PATTERNS = {
+    "id": r"[+-]?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?",
+    "en": r"[+-]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?",
+}
+_CURRENCY = r"^\s*(?:Rp\.?|IDR)\s*"
+# bentuk angka setelah pemisah ribuan dibuang dan desimal dijadikan titik
+_PLAIN_NUMBER = r"^[+-]?(?:\d+\.?\d*|\.\d+)$"
+
+
+def _is_text(s: pd.Series) -> pd.Series:
+    if pd.api.types.infer_dtype(s, skipna=True) == "string":
+        return s.notna()
+    # .str pada kolom object campuran: elemen non-string (float/datetime dari Excel) → NaN
+    try:
+        return s.str.len().notna()
+    except AttributeError:  # tidak ada string sama sekali
+        return pd.Series(False, index=s.index)
+
+
+def _clean(texts: pd.Series) -> pd.Series:
+    return texts.str.replace(_CURRENCY, "", regex=True).str.strip()
+
+
+def _arrow_text(texts: pd.Series):
+    import pyarrow as pa
+
+    return pa.array(texts, type=pa.string(), from_pandas=True)
+
+
+def _parse_date_text(texts: pd.Series, fmt: str) -> pd.Series:
+    """Teks → datetime64 dengan satu format; gagal → NaT.
+
+    Format strptime di-parse kernel Arrow (C++, jauh lebih cepat dari jalur
+    strptime per elemen milik pandas untuk format non-ISO).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if fmt != "ISO8601":
+        try:
+            parsed = pc.strptime(_arrow_text(texts), format=fmt, unit="ns", error_is_null=True)
+            return pd.Series(parsed.to_numpy(zero_copy_only=False), index=texts.index, name=texts.name)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass  # mis. %b tidak didukung Arrow di platform ini → jalur pandas
+    return pd.to_datetime(texts, format=fmt, errors="coerce")
+
+
+def _sample(s: pd.Series) -> pd.Series:
+    values = s.dropna()
+    if len(values) > SAMPLE_SIZE:
+        values = values.iloc[np.linspace(0, len(values) - 1, SAMPLE_SIZE).astype(np.int64)]
+    return values
+
+
+def _number_format(sample: pd.Series):
+    """(format, porsi_cocok) angka-sebagai-teks pada sampel, atau (None, 0)."""
+    is_text = _is_text(sample)
+    texts = _clean(sample[is_text])
+    if texts.empty:
+        return None, 0.0
+    native = pd.to_numeric(sample[~is_text], errors="coerce").notna().sum()
+    scores = {fmt: int(texts.str.fullmatch(p).sum()) for fmt, p in NUMBER_PATTERNS.items()}
+    if scores["id"] == scores["en"]:
+        # semua teks cocok dengan keduanya (mis. "1.500"): titik dibaca sebagai pemisah ribuan
+        fmt = "id" if texts.str.contains(".", regex=False).any() else "en"
+    else:
+        fmt = max(scores, key=scores.get)
+    return fmt, (native + scores[fmt]) / len(sample)
+
+
+def _date_formats(sample: pd.Series, min_match: float = INFER_MIN_MATCH):
+    """(daftar_format, porsi_cocok) tanggal pada sampel; format dipilih serakah untuk data campuran."""
+    is_text = _is_text(sample)
+    native = sum(isinstance(v, (datetime.date, np.datetime64)) for v in sample[~is_text])
+    remaining = sample[is_text].str.strip() if is_text.any() else sample[is_text]
+    if remaining.empty:
+        # hanya tanggal asli (mis. objek date dari Excel): cukup dikonversi langsung
+        return (["ISO8601"], native / len(sample)) if native else ([], 0.0)
+    # kolom teks tanpa angka (nama, kategori) jelas bukan tanggal → lewati parse percobaan
+    if remaining.str.contains(r"\d").mean() < min_match:
+        return [], 0.0
+    chosen = []
+    while len(remaining) and len(chosen) < MAX_DATE_FORMATS:
+        best, best_parsed = None, None
+        for fmt in DATE_FORMATS:
+            if fmt in chosen:
+                continue
+            parsed = _parse_date_text(remaining, fmt)
+            if best_parsed is None or parsed.notna().sum() > best_parsed.notna().sum():
+                best, best_parsed = fmt, parsed
+        if best_parsed is None or not best_parsed.notna().any():
+            break
+        chosen.append(best)
+        remaining = remaining[best_parsed.isna()]
+    matched = is_text.sum() - len(remaining)
+    return chosen, (native + matched) / len(sample)
+
+
+def infer_schema(df: pd.DataFrame) -> list:
+    """Tebak tipe kolom teks dari sampel: angka-sebagai-teks atau tanggal (beserta formatnya).
+
+    Kolom pertama dicoba sebagai tanggal lebih dulu (cukup DATE_COL_MIN_MATCH cocok),
+    kolom lain sebagai angka lebih dulu. Return daftar {"column", "kind": "number"|"date",
+    "format"}; kolom yang tidak dikenali tidak dicantumkan.
+    """
+    schema = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        if s.dtype != object and not pd.api.types.is_string_dtype(s):
+            continue
+        sample = _sample(s)
+        if sample.empty:
+            continue
+        checks = ["date", "number"] if i == 0 else ["number", "date"]
+        for kind in checks:
+            min_match = DATE_COL_MIN_MATCH if i == 0 and kind == "date" else INFER_MIN_MATCH
+            fmt, share = _number_format(sample) if kind == "number" else _date_formats(sample, min_match)
+            if fmt and share >= min_match:
+                schema.append({"column": col, "kind": kind, "format": fmt})
+                break
+    return schema
+
+
+def _blank(s: pd.Series, is_text: pd.Series) -> pd.Series:
+    # teks kosong/spasi saja dianggap nilai kosong, bukan gagal konversi
+    import pyarrow.compute as pc
+
+    trimmed = pc.utf8_trim_whitespace(_arrow_text(s[is_text]))
+    blank = pd.Series(False, index=s.index)
+    blank[is_text] = pc.fill_null(pc.equal(trimmed, ""), False).to_numpy(zero_copy_only=False)
+    return blank
+
+
+def to_number(s: pd.Series, fmt: str, is_text: pd.Series = None) -> pd.Series:
+    """Konversi angka-sebagai-teks berformat fmt ("id"/"en") dengan kernel string Arrow."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    is_text = _is_text(s) if is_text is None else is_text
+    arr = pc.utf8_trim_whitespace(pc.replace_substring_regex(_arrow_text(s[is_text]), _CURRENCY, ""))
+    if fmt == "id":
+        arr = pc.replace_substring(pc.replace_substring(arr, ".", ""), ",", ".")
+    else:
+        arr = pc.replace_substring(arr, ",", "")
+    # teks yang bukan angka → null (cast Arrow akan error, bukan NaN)
+    arr = pc.if_else(pc.match_substring_regex(arr, _PLAIN_NUMBER), arr, pa.scalar(None, pa.string()))
+    numbers = pd.Series(pc.cast(arr, pa.float64()).to_numpy(zero_copy_only=False), index=s.index[is_text])
+    if is_text.all():
+        return numbers.rename(s.name)
+    # elemen non-teks (angka asli dari Excel) dipakai apa adanya
+    return pd.to_numeric(s.mask(is_text, numbers), errors="coerce")
+
+
+def to_date(s: pd.Series, formats: list, is_text: pd.Series = None) -> pd.Series:
+    """Konversi tanggal dengan format terdeteksi; format berikutnya hanya untuk sisa yang gagal."""
+    is_text = _is_text(s) if is_text is None else is_text
+    if is_text.all():
+        out = _parse_date_text(s, formats[0])
+    else:
+        # elemen non-teks (datetime asli dari Excel) dikonversi langsung
+        out = pd.to_datetime(s.where(~is_text), errors="coerce")
+        out[is_text] = _parse_date_text(s[is_text], formats[0])
+    for fmt in formats[1:]:
+        rest = out.isna() & is_text
+        if not rest.any():
+            break
+        out[rest] = _parse_date_text(s[rest], fmt)
+    return out
+
+
+def apply_schema(df: pd.DataFrame, schema: list):
+    """Terapkan hasil infer_schema; kolom yang tidak ada di df dilewati.
+
+    Return (df_baru, laporan) dengan laporan per kolom: jumlah nilai terisi,
+    jumlah yang gagal dikonversi (jadi NaN/NaT), porsi gagal, contoh nilai gagal,
+    dan apakah konversi dipakai (dibatalkan jika porsi gagal > MAX_FAIL_RATE).
+    """
+    out, report = {}, []
+    for item in schema:
+        col = item["column"]
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if s.dtype != object and not pd.api.types.is_string_dtype(s):
+            continue  # sudah bertipe (mis. diterapkan ke file tambahan yang terbaca numerik)
+        is_text = _is_text(s)
+        convert = to_number if item["kind"] == "number" else to_date
+        converted = convert(s, item["format"], is_text)
+        present = s.notna() & ~_blank(s, is_text)
+        failed = present & converted.isna()
+        total, n_failed = int(present.sum()), int(failed.sum())
+        rate = n_failed / total if total else 0.0
+        applied = rate <= MAX_FAIL_RATE
+        if applied:
+            out[col] = converted
+        report.append({**item, "total": total, "failed": n_failed, "rate": rate, "applied": applied,
+                       "examples": s[failed].head(3).astype(str).tolist()})
+    if out:
+        df = df.copy(deep=False)
+        for col, values in out.items():
+            df[col] = values
+    return df, report
@@ -0,0 +1,381 @@
+import io
+import json
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+from utils.compact import compact_dtypes, memory_bytes
+from utils.dataset_cache import content_hash, load_cached, load_meta, save_cached
+from utils.infer import apply_schema, infer_schema
+from utils.perf import stage
+from utils.timeindex import canonicalize, has_time_index, range_positions
+
+# ====== Konfigurasi ingest ======
+CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", 50_000))
+MAX_DATASET_BYTES = int(os.environ.get("DATASET_MAX_BYTES", 1024 * 1024 * 1024))  # default 1 GB
+SHEET_WORKERS = int(os.environ.get("INGEST_SHEET_WORKERS", min(4, os.cpu_count() or 1)))
+SHEET_COL = "Sheet"
+# puncak memori ingest ≈ sekian × ukuran data mentah: potongan + hasil concat hidup
+# bersamaan saat dirakit, lalu data mentah + salinan terurut saat prepare
+INGEST_PEAK_COPIES = 2
+
+
+class DatasetTooLarge(MemoryError):
+    """Dataset melebihi batas memori ingest (DATASET_MAX_BYTES)."""
+
+
+def _check_budget(used: int, max_bytes: int, copies: int = 1):
+    if used * copies > max_bytes:
+        raise DatasetTooLarge(
+            f"Ukuran data melebihi batas memori {max_bytes / 1024**2:,.0f} MB "
+            f"(terbaca ±{used / 1024**2:,.0f} MB, butuh ±{used * copies / 1024**2:,.0f} MB saat diproses). "
+            "Perkecil file atau naikkan DATASET_MAX_BYTES."
+        )
+
+
+def _assemble(chunks, progress=None, max_bytes: int = MAX_DATASET_BYTES) -> pd.DataFrame:
+    """Kumpulkan chunk satu per satu sambil menjaga batas memori.
+
+    Batas dihitung untuk puncak memori (INGEST_PEAK_COPIES × data terbaca), bukan
+    hanya ukuran chunk: concat dan prepare membuat salinan selagi data mentah masih hidup.
+    """
+    parts, used = [], 0
+    for chunk, frac in chunks:
+        used += int(chunk.memory_usage(deep=True).sum())
+        _check_budget(used, max_bytes, INGEST_PEAK_COPIES)
+        parts.append(chunk)
+        if progress is not None and frac is not None:
+            progress(min(frac, 1.0))
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True, copy=False)
+    parts.clear()  # lepas potongan sebelum infer_objects membuat salinan berikutnya
+    # kolom yang di chunk awal kosong (object) tapi berisi angka di chunk lain → rapikan
+    return df.infer_objects()
+
+
+def _unique_columns(names):
+    """Nama kolom kembar diberi akhiran .1, .2, … (sama seperti pandas)."""
+    seen, out = {}, []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        out.append(name)
+    return out
+
+
+def iter_csv_chunks(buffer, chunk_rows: int = CHUNK_ROWS):
+    """Generator (chunk, progres 0..1) untuk file CSV."""
+    total = buffer.seek(0, os.SEEK_END)
+    buffer.seek(0)
+    for chunk in pd.read_csv(buffer, chunksize=chunk_rows):
+        yield chunk, (buffer.tell() / total if total else None)
+
+
+def iter_xlsx_chunks(buffer, chunk_rows: int = CHUNK_ROWS, sheet=None):
+    """Generator (chunk, progres 0..1) untuk XLSX via openpyxl mode read-only (default sheet pertama)."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(buffer, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        total = ws.max_row  # bisa None jika dimensi sheet tidak tercatat
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        # samakan penamaan dengan pd.read_excel untuk header kosong
+        columns = _unique_columns([h if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)])
+        width = len(columns)
+
+        buf, seen = [], 1
+        for row in rows:
+            seen += 1
+            if all(v is None for v in row):
+                continue
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame.from_records(buf, columns=columns), (seen / total if total else None)
+                buf = []
+        if buf:
+            yield pd.DataFrame.from_records(buf, columns=columns), 1.0
+    finally:
+        wb.close()
+
+
+def read_upload(uploaded_file, progress=None, max_bytes: int = MAX_DATASET_BYTES, sheet=None) -> pd.DataFrame:
+    """Parse file unggahan (CSV/XLSX bertahap, XLS sekaligus); sheet None = sheet pertama."""
+    ext = os.path.splitext(uploaded_file.name)[1].lower()
+    uploaded_file.seek(0)
+    if ext == ".csv":
+        return _assemble(iter_csv_chunks(uploaded_file), progress, max_bytes)
+    if ext == ".xlsx":
+        return _assemble(iter_xlsx_chunks(uploaded_file, sheet=sheet), progress, max_bytes)
+    # .xls (format lama) tidak didukung openpyxl → baca sekaligus
+    df = pd.read_excel(uploaded_file, sheet_name=sheet if sheet is not None else 0)
+    _check_budget(int(df.memory_usage(deep=True).sum()), max_bytes, INGEST_PEAK_COPIES)
+    if progress is not None:
+        progress(1.0)
+    return df
+
+
+def prepare(raw: pd.DataFrame, schema: list = None):
+    """Bentuk dataset yang disimpan di cache: tipe dikonversi, dipadatkan, diurutkan.
+
+    schema None = tebak dari sampel (infer_schema); skema dataset lain bisa
+    diberikan agar file tambahan dikonversi dengan format yang sama.
+    Return (df, laporan) dengan laporan = {"before", "after", "types"}.
+    """
+    before = memory_bytes(raw)
+    with stage("infer_types"):
+        if schema is None:
+            schema = infer_schema(raw)
+        df, types = apply_schema(raw, schema)
+    with stage("compact_dtypes"):
+        df, report = compact_dtypes(df)
+    with stage("canonicalize"):
+        df = canonicalize(df)
+    return df, {**report, "before": before, "types": types}
+
+
+def _schema_key(key: str, schema: list) -> str:
+    # file yang sama dengan skema paksaan berbeda → entri cache berbeda
+    if schema is None:
+        return key
+    return content_hash(f"{key}:schema:{json.dumps(schema, default=str, sort_keys=True)}".encode("utf-8"))
+
+
+def load_upload(uploaded_file, progress=None, schema: list = None):
+    """Ambil dataset dari cache berdasarkan hash isi; parse bertahap jika belum ada.
+
+    Dataset disimpan ke cache dalam bentuk hasil prepare (tipe dikonversi,
+    dipadatkan, terurut dengan DatetimeIndex) beserta laporan konversi tipenya.
+    Return (key, df, laporan_memori); laporan None jika dimuat dari cache.
+    """
+    key = _schema_key(content_hash(uploaded_file.getvalue()), schema)
+    with stage("cache_load"):
+        df = load_cached(key)
+    report = None
+    if df is None:
+        with stage("parse"):
+            raw = read_upload(uploaded_file, progress)
+        df, report = prepare(raw, schema)
+        with stage("cache_save"):
+            save_cached(key, df, meta={"types": report["types"], **dataset_meta(df)})
+    return key, df, report
+
+
+def dataset_types(key: str):
+    """Laporan konversi tipe (lihat apply_schema) yang tersimpan bersama dataset di cache."""
+    meta = load_meta(key) if key else None
+    return meta.get("types") if meta else None
+
+
+def type_schema(types) -> list:
+    """Skema (kolom, jenis, format) dari laporan konversi; hanya konversi yang dipakai."""
+    return [{k: t[k] for k in ("column", "kind", "format")} for t in types or () if t.get("applied")]
+
+
+# ====== Workbook multi-sheet ======
+def sheet_names(uploaded_file) -> list:
+    """Daftar sheet dari metadata workbook tanpa membaca isi sel; [] untuk CSV."""
+    ext = os.path.splitext(uploaded_file.name)[1].lower()
+    if ext == ".csv":
+        return []
+    uploaded_file.seek(0)
+    if ext == ".xlsx":
+        # xl/workbook.xml hanya berisi daftar sheet (isi sel ada di xl/worksheets/*)
+        with zipfile.ZipFile(uploaded_file) as zf:
+            root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        # cocokkan nama tag lokal: namespace berbeda untuk OOXML transitional vs strict
+        return [el.get("name") for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "sheet"]
+    return pd.ExcelFile(uploaded_file).sheet_names
+
+
+def sheet_key(file_key: str, sheet) -> str:
+    """Kunci cache satu sheet dari sebuah file."""
+    return content_hash(f"{file_key}:sheet:{sheet}".encode("utf-8"))
+
+
+def _parse_sheet(data: bytes, name: str, sheet, max_bytes: int):
+    # dijalankan di worker process: parse + padatkan + urutkan satu sheet
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return prepare(read_upload(buffer, max_bytes=max_bytes, sheet=sheet))
+
+
+def load_sheets(uploaded_file, sheets, progress=None, max_workers: int = SHEET_WORKERS,
+                max_bytes: int = MAX_DATASET_BYTES) -> dict:
+    """Muat beberapa sheet; tiap sheet di-cache sendiri, sheet yang belum ada di-parse paralel.
+
+    Return {sheet: (key, df, laporan_memori)}; laporan None jika dari cache.
+    """
+    data = uploaded_file.getvalue()
+    file_key = content_hash(data)
+    out, missing = {}, []
+    for sheet in sheets:
+        key = sheet_key(file_key, sheet)
+        with stage("cache_load"):
+            df = load_cached(key)
+        if df is None:
+            missing.append((sheet, key))
+        else:
+            out[sheet] = (key, df, None)
+
+    workers = min(max_workers, len(missing))
+    with stage("parse"):
+        if workers <= 1:
+            for i, (sheet, key) in enumerate(missing, 1):
+                out[sheet] = (key, *_parse_sheet(data, uploaded_file.name, sheet, max_bytes))
+                if progress is not None:
+                    progress(i / len(missing))
+        else:
+            # openpyxl murni Python (terikat GIL) → process pool; spawn aman dari server multi-thread
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {pool.submit(_parse_sheet, data, uploaded_file.name, sheet, max_bytes): (sheet, key)
+                           for sheet, key in missing}
+                for i, future in enumerate(as_completed(futures), 1):
+                    sheet, key = futures[future]
+                    out[sheet] = (key, *future.result())
+                    if progress is not None:
+                        progress(i / len(missing))
+    _check_budget(sum(int(df.memory_usage(deep=True).sum()) for _, df, _ in out.values()), max_bytes)
+    with stage("cache_save"):
+        for sheet, key in missing:
+            _, df, report = out[sheet]
+            save_cached(key, df, meta={"types": report["types"], **dataset_meta(df)})
+    return {sheet: out[sheet] for sheet in sheets}
+
+
+def combine_sheets(frames: dict, sheet_col: str = SHEET_COL) -> pd.DataFrame:
+    """Gabungkan {sheet: df} menjadi satu dataset format panjang dengan kolom nama sheet.
+
+    Kolom pertama (tanggal) disamakan namanya; kolom yang tidak ada di suatu sheet berisi NaN.
+    """
+    date_col = next(iter(frames.values())).columns[0]
+    parts = [df.rename(columns={df.columns[0]: date_col}).assign(**{sheet_col: str(name)})
+             for name, df in frames.items()]
+    combined = pd.concat(parts, ignore_index=True)
+    combined[sheet_col] = pd.Categorical(combined[sheet_col], categories=[str(s) for s in frames])
+    # kategori berbeda antar sheet membuat concat jatuh ke object → jadikan category lagi
+    for col in combined.columns:
+        if combined[col].dtype == object and any(
+                isinstance(df[col].dtype, pd.CategoricalDtype) for df in parts if col in df.columns):
+            combined[col] = combined[col].astype("category")
+    return canonicalize(combined)
+
+
+def load_combined(uploaded_file, sheets, progress=None):
+    """Muat beberapa sheet lalu gabungkan (combine_sheets); hasil gabungan juga di-cache.
+
+    Return (key, df, laporan_memori) seperti load_upload.
+    """
+    file_key = content_hash(uploaded_file.getvalue())
+    key = content_hash(f"{file_key}:combined:{'|'.join(map(str, sheets))}".encode("utf-8"))
+    with stage("cache_load"):
+        df = load_cached(key)
+    if df is not None:
+        return key, df, None
+    loaded = load_sheets(uploaded_file, sheets, progress)
+    with stage("combine_sheets"):
+        df = combine_sheets({sheet: part for sheet, (_, part, _) in loaded.items()})
+    # laporan tipe per sheet (dari hasil parse atau dari cache sheet)
+    types = []
+    for sheet, (part_key, _, part_report) in loaded.items():
+        part_types = part_report["types"] if part_report else dataset_types(part_key)
+        types += [{**t, "sheet": str(sheet)} for t in part_types or ()]
+    reports = [report for _, _, report in loaded.values()]
+    report = None
+    if all(reports):
+        report = {k: sum(r[k] for r in reports) for k in ("before", "after")}
+        report["types"] = types
+    with stage("cache_save"):
+        save_cached(key, df, meta={"types": types, **dataset_meta(df)})
+    return key, df, report
+
+
+def dataset_meta(df: pd.DataFrame) -> dict:
+    """Metadata dataset yang cukup dihitung sekali saat ingest (mis. step waktu dominan).
+
+    Disimpan di metadata file cache bersama laporan tipe (lihat save_cached).
+    """
+    from utils.forecast import infer_step
+
+    meta = {"rows": len(df), "step": None}
+    if has_time_index(df):
+        meta["step"] = infer_step(df.index.to_series())
+    return meta
+
+
+def dataset_step(key: str, df: pd.DataFrame):
+    """Step waktu dominan dari metadata cache dataset; dihitung dari df jika tidak tersimpan."""
+    meta = load_meta(key) if key else None
+    if meta and "step" in meta:
+        return pd.Timedelta(meta["step"]) if meta["step"] is not None else None
+    return dataset_meta(df)["step"]
+
+
+def _existing_rows(base: pd.DataFrame, rows: pd.DataFrame, key_cols) -> np.ndarray:
+    # mask baris `rows` yang kuncinya sudah ada di base; hanya rentang tanggal rows yang dibandingkan
+    if rows.empty:
+        return np.zeros(0, dtype=bool)
+    lo, hi = range_positions(base, rows[key_cols[0]].min(), rows[key_cols[0]].max())
+    window = base.iloc[lo:hi]
+    as_keys = lambda df: pd.MultiIndex.from_arrays([df[key_cols[0]], df[key_cols[1]].astype(str)])
+    return as_keys(rows).isin(as_keys(window))
+
+
+def append_rows(base: pd.DataFrame, delta: pd.DataFrame):
+    """Tambahkan baris delta ke dataset (keduanya hasil ingest).
+
+    Skema harus sama (nama & urutan kolom, kolom pertama tanggal). Baris delta
+    bertanggal kosong, kembar di dalam delta, atau sudah ada di dataset dilewati;
+    untuk dataset gabungan multi-sheet (ada kolom SHEET_COL) kunci barisnya
+    (tanggal, sheet), karena tiap tanggal muncul sekali per sheet.
+    Return (df_baru, n_lama, ditambah, dilewati); n_lama None jika baris baru
+    tidak semuanya sesudah data lama (dataset diurutkan ulang penuh).
+    """
+    if list(delta.columns) != list(base.columns):
+        raise ValueError(
+            "Kolom file tambahan tidak sama dengan dataset. "
+            f"Diharapkan: {', '.join(map(str, base.columns))}; "
+            f"diterima: {', '.join(map(str, delta.columns))}."
+        )
+    date_col = base.columns[0]
+    if not has_time_index(base) or not pd.api.types.is_datetime64_any_dtype(delta[date_col]):
+        raise ValueError(f"Mode tambah data membutuhkan kolom pertama (**{date_col}**) bertipe tanggal.")
+
+    by_sheet = SHEET_COL in base.columns
+    key_cols = [date_col, SHEET_COL] if by_sheet else [date_col]
+    fresh = delta[delta[date_col].notna() & ~delta.duplicated(subset=key_cols)]
+    keys = base.index.asi8
+    new_keys = fresh[date_col].dt.as_unit(base.index.unit).to_numpy().astype(np.int64)
+    if by_sheet:
+        exists = _existing_rows(base, fresh, key_cols)
+    else:
+        pos = np.minimum(np.searchsorted(keys, new_keys), max(len(keys) - 1, 0))
+        exists = (keys[pos] == new_keys) if len(keys) else np.zeros(len(fresh), dtype=bool)
+    fresh = fresh[~exists]
+    skipped = len(delta) - len(fresh)
+    if fresh.empty:
+        return base, len(base), 0, skipped
+
+    combined = pd.concat([base, fresh])
+    # kategori yang berbeda antar file membuat concat jatuh ke object → jadikan category lagi
+    for col in base.columns:
+        if isinstance(base[col].dtype, pd.CategoricalDtype) and combined[col].dtype == object:
+            combined[col] = combined[col].astype("category")
+
+    if len(keys) and new_keys[~exists].min() <= keys[-1]:
+        return canonicalize(combined), None, len(fresh), skipped
+    return combined, len(base), len(fresh), skipped
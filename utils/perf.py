@@ -0,0 +1,191 @@
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ====== Konfigurasi instrumentasi ======
+# opt-in: jika diisi, ringkasan tiap rerun ditambahkan ke file ini (JSON Lines) untuk diagregasi
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH")
+# jumlah rerun yang disimpan per sesi (untuk unduhan log dari panel)
+MAX_HISTORY = 50
+
+_local = threading.local()  # rekaman rerun aktif milik thread script Streamlit (rerun penuh atau fragment)
+_log_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Resident set size proses saat ini (Linux), None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@contextmanager
+def stage(name: str):
+    """Ukur durasi dan perubahan RSS satu tahap ke rekaman rerun aktif.
+
+    Tanpa rerun aktif (mis. CLI batch) tidak mencatat apa pun.
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        yield
+        return
+    rss0, t0 = rss_bytes(), time.perf_counter()
+    try:
+        yield
+    finally:
+        t1, rss1 = time.perf_counter(), rss_bytes()
+        run["stages"].append({
+            "stage": name,
+            "ms": round((t1 - t0) * 1000, 3),
+            "rss_delta_bytes": rss1 - rss0 if rss0 is not None and rss1 is not None else None,
+        })
+        run["end"] = t1
+
+
+def timed_import(name: str):
+    """Import modul berat saat dibutuhkan; import pertama di proses tercatat sebagai tahap import:<modul>."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with stage(f"import:{name}"):
+        return importlib.import_module(name)
+
+
+def plotly_chart(fig, name: str, **kwargs):
+    """st.plotly_chart yang diukur; mencakup serialisasi figure ke payload browser."""
+    import streamlit as st
+
+    with stage(f"kirim:{name}"):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def _session_key():
+    # key dataset sesi langsung dari handle di session_state: perf tidak mengimport
+    # utils.registry (pandas, pyarrow, ingest) di halaman yang tidak memakai dataset
+    import streamlit as st
+
+    return getattr(st.session_state.get("dataset"), "key", None)
+
+
+def _registry():
+    # registry hanya dibaca jika sudah dimuat oleh halaman yang memakai dataset
+    module = sys.modules.get("utils.registry")
+    return module.REGISTRY if module is not None else None
+
+
+def _finish(run: dict) -> dict:
+    registry = _registry()
+    record = {
+        "page": run["page"],
+        "fragment": run["fragment"],
+        "timestamp": run["timestamp"],
+        "total_ms": round((run["end"] - run["t0"]) * 1000, 3),
+        "stages": run["stages"],
+        "dataset_key": run["dataset_key"],
+        "dataset_bytes": registry.entry_bytes(run["dataset_key"]) if registry and run["dataset_key"] else None,
+        "registry_bytes": registry.stats()["bytes"] if registry else None,
+        "rss_bytes": rss_bytes(),
+    }
+    if PERF_LOG_PATH:
+        try:
+            with _log_lock, open(PERF_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass  # log performa tidak boleh mengganggu halaman
+    return record
+
+
+def begin(page: str, fragment: str = None):
+    """Mulai rekaman rerun halaman; rekaman rerun sebelumnya ditutup dan masuk riwayat sesi.
+
+    Dipanggil paling awal di halaman (sebelum import modul halaman di dalam
+    stage("import:halaman")) agar waktu import ikut terukur. Rerun fragment
+    dimulai lewat dekorator fragment (fragment = nama fragment).
+    """
+    import streamlit as st
+
+    history = st.session_state.setdefault("perf_history", deque(maxlen=MAX_HISTORY))
+    previous = st.session_state.get("perf_run")
+    if previous is not None and previous["stages"]:
+        history.append(_finish(previous))
+    t0 = time.perf_counter()
+    run = {"page": page, "fragment": fragment, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "t0": t0, "end": t0,
+           "stages": [], "dataset_key": _session_key()}
+    st.session_state["perf_run"] = run
+    _local.run = run
+
+
+def _fragment_rerun() -> bool:
+    # rerun yang hanya menjalankan fragment: script halaman (dan begin()) tidak dijalankan
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def fragment(name: str):
+    """Dekorator isi st.fragment agar rerun fragment punya rekaman sendiri.
+
+    Rerun fragment berjalan tanpa begin() halaman, sehingga stage() di dalamnya
+    tidak tercatat. Di rerun penuh, tahap fragment ikut rekaman halaman; di rerun
+    fragment, rekaman baru dimulai dengan halaman yang sama dan nama fragment ini.
+
+        @st.fragment
+        @fragment("scatter")
+        def scatter_chart(...): ...
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _fragment_rerun():
+                import streamlit as st
+
+                previous = st.session_state.get("perf_run")
+                begin(previous["page"] if previous else "?", fragment=name)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def panel():
+    """Panel ⏱️ Performance di sidebar: rincian rerun terakhir yang selesai + memori dataset."""
+    import streamlit as st
+
+    from utils.warmup import REPORT
+
+    history = st.session_state.get("perf_history")
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        if not history:
+            st.caption("Belum ada rerun yang terekam.")
+        else:
+            last = history[-1]
+            where = f"{last['page']} › {last['fragment']}" if last.get("fragment") else last["page"]
+            st.caption(f"Rerun terakhir: **{where}** · {last['timestamp']}")
+            st.metric("Total", f"{last['total_ms']:,.1f} ms")
+            import pandas as pd  # hanya saat ada rincian rerun; warm-up biasanya sudah memuatnya
+
+            table = pd.DataFrame(last["stages"])
+            table["%"] = (table["ms"] / max(last["total_ms"], 1e-9) * 100).round(1)
+            # RSS tidak tersedia (mis. macOS/Windows) → kolom None; jadikan NaN agar tetap numerik
+            table["RSS Δ (MB)"] = (pd.to_numeric(table["rss_delta_bytes"], errors="coerce") / 1024**2).round(2)
+            st.dataframe(table.drop(columns="rss_delta_bytes"), hide_index=True, use_container_width=True)
+
+        key, registry = _session_key(), _registry()
+        mb = lambda b: f"{b / 1024**2:,.1f} MB" if b is not None else "-"
+        st.caption(f"Dataset sesi: **{mb(registry.entry_bytes(key) if registry and key else None)}** · "
+                   f"Registry: **{mb(registry.stats()['bytes'] if registry else None)}** · "
+                   f"RSS proses: **{mb(rss_bytes())}**")
+        if REPORT:
+            st.caption("Warm-up: " + " · ".join(f"{name} {ms:,.0f} ms" for name, ms in REPORT.items()))
+        if history:
+            st.download_button("⬇️ Unduh log performa (JSON)", data=json.dumps(list(history), indent=2),
+                               file_name="performance_log.json", mime="application/json")
+
@@ -0,0 +1,169 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.cow import enable_copy_on_write
+from utils.export import write_frame
+from utils.forecast import METHODS, _aligned_matrix, batch_forecast, infer_step, make_future_dates
+from utils.ingest import prepare, read_upload
+from utils.smoothing import SMOOTHING_METHODS, fit
+from utils.stats_index import StatsIndex
+from utils.timeindex import has_time_index, slice_range
+
+# Engine tanpa Streamlit: dipakai halaman (Analisis, Forecasting) dan CLI batch.
+#   python -m utils.pipeline DIR_INPUT -o DIR_OUTPUT [--format parquet|csv|xlsx] [--method linear] …
+
+# ====== Konfigurasi batch ======
+EXTENSIONS = (".xlsx", ".xls", ".csv")
+OUTPUT_FORMATS = ("parquet", "csv", "xlsx")
+MAX_WORKERS = int(os.environ.get("PIPELINE_MAX_WORKERS", os.cpu_count() or 1))
+# alias pendek untuk CLI → label metode di halaman Forecasting
+METHOD_ALIASES = dict(zip(["linear", "naive", "mean", "holt", "holt-winters"], METHODS + SMOOTHING_METHODS))
+DESCRIBE_INDEX = ["count", "mean", "std", "min", "25%", "50%", "75%", "max", "sum"]
+
+
+# ====== Ingest ======
+def load_path(path: str) -> pd.DataFrame:
+    """Baca workbook/CSV dari disk dengan jalur ingest yang sama seperti unggahan."""
+    with open(path, "rb") as f:
+        df, _ = prepare(read_upload(f))
+    return df
+
+
+# ====== Statistik ======
+def describe_columns(df: pd.DataFrame, cols=None, start=None, end=None, index: StatsIndex = None) -> pd.DataFrame:
+    """Statistik deskriptif (seperti df.describe() + sum) per kolom numerik untuk rentang tanggal.
+
+    count/mean/std/min/max/sum dari StatsIndex; hanya kuartil yang membaca data.
+    """
+    if cols is None:
+        cols = df.select_dtypes(include="number").columns.tolist()
+    index = index if index is not None else StatsIndex(df)
+    sub = slice_range(df, start, end)
+    out = {}
+    for col in cols:
+        s = index.summary(col, start, end)
+        quartiles = np.nanpercentile(sub[col].to_numpy(dtype=np.float64, na_value=np.nan), [25, 50, 75]) \
+            if s["count"] else (np.nan, np.nan, np.nan)
+        out[col] = [s["count"], s["mean"], s["std"], s["min"], *quartiles, s["max"], s["sum"]]
+    return pd.DataFrame(out, index=DESCRIBE_INDEX, columns=list(cols))
+
+
+# ====== Forecast ======
+def forecast_all(df: pd.DataFrame, cols, method: str, n: int, window: int = 7, season: int = 7) -> pd.DataFrame:
+    """Forecast banyak kolom; tabel lebar (Tanggal + satu kolom per seri).
+
+    Metode sederhana lewat batch_forecast (vektor); Holt/Holt-Winters di-fit per
+    kolom, kolom yang datanya terlalu pendek berisi NaN.
+    """
+    date_col = df.columns[0]
+    if method in METHODS:
+        return batch_forecast(df, date_col, cols, method, n, window)
+    if method not in SMOOTHING_METHODS:
+        raise ValueError(f"Metode '{method}' tidak dikenal.")
+
+    m = season if method == SMOOTHING_METHODS[1] else 0
+    dates, Y = _aligned_matrix(df, date_col, cols)
+    out = pd.DataFrame(index=range(n))
+    for j, col in enumerate(cols):
+        y = Y[:, j]
+        try:
+            out[col] = fit(y[~np.isnan(y)], m).forecast(n)
+        except ValueError:
+            out[col] = np.nan
+    future = make_future_dates(dates.iloc[-1], infer_step(dates), n) if len(dates) else pd.DatetimeIndex([])
+    out.insert(0, "Tanggal", future)
+    return out
+
+
+# ====== Batch per file ======
+def process_file(path: str, out_dir: str, fmt: str = "parquet", method: str = METHODS[0],
+                 horizon: int = 12, window: int = 7, season: int = 7) -> dict:
+    """Proses satu file: tulis <file>.stats.<fmt> dan <file>.forecast.<fmt> ke out_dir.
+
+    Error per file dicatat di hasil (kolom Status), bukan menghentikan batch.
+    """
+    t0 = time.perf_counter()
+    # nama file lengkap (dengan ekstensi) dipakai agar data.csv & data.xlsx tidak saling timpa
+    name = os.path.basename(path)
+    result = {"File": name, "Baris": 0, "Kolom": 0, "Status": "OK"}
+    try:
+        df = load_path(path)
+        cols = df.select_dtypes(include="number").columns.tolist()
+        result["Baris"], result["Kolom"] = len(df), len(cols)
+        if not cols:
+            raise ValueError("tidak ada kolom numerik")
+
+        stats = describe_columns(df, cols).T.astype({"count": "int64"}).rename_axis("Kolom").reset_index()
+        write_frame(stats, os.path.join(out_dir, f"{name}.stats.{fmt}"), fmt)
+        if has_time_index(df):
+            fcst = forecast_all(df, cols, method, horizon, window, season)
+            write_frame(fcst, os.path.join(out_dir, f"{name}.forecast.{fmt}"), fmt)
+        else:
+            result["Status"] = "OK (tanpa forecast: kolom pertama bukan tanggal)"
+    except Exception as e:
+        result["Status"] = f"Gagal: {e}"
+    result["Detik"] = round(time.perf_counter() - t0, 3)
+    return result
+
+
+def _run(args):
+    return process_file(*args)
+
+
+def run_batch(input_dir: str, out_dir: str, fmt: str = "parquet", method: str = METHODS[0],
+              horizon: int = 12, window: int = 7, season: int = 7,
+              max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """Proses semua workbook di input_dir; lebih dari satu file dibagi ke process pool."""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Format output harus salah satu dari: {', '.join(OUTPUT_FORMATS)}.")
+    os.makedirs(out_dir, exist_ok=True)
+    paths = sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(EXTENSIONS) and not name.startswith("~$")  # ~$: file lock Excel
+    )
+    tasks = [(p, out_dir, fmt, method, horizon, window, season) for p in paths]
+    workers = min(max_workers, len(tasks))
+    if workers <= 1:
+        results = [_run(t) for t in tasks]
+    else:
+        # spawn: sama seperti backtest, aman dari proses multi-thread
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(_run, tasks))
+    return pd.DataFrame(results, columns=["File", "Baris", "Kolom", "Status", "Detik"])
+
+
+# ====== CLI ======
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.pipeline",
+        description="Hitung statistik deskriptif dan forecast untuk semua workbook di satu folder.",
+    )
+    parser.add_argument("input_dir", help="folder berisi file .xlsx/.xls/.csv")
+    parser.add_argument("-o", "--output", required=True, help="folder output")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="parquet")
+    parser.add_argument("--method", choices=list(METHOD_ALIASES), default="linear")
+    parser.add_argument("--horizon", type=int, default=12)
+    parser.add_argument("--window", type=int, default=7, help="window metode mean")
+    parser.add_argument("--season", type=int, default=7, help="periode musim holt-winters")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    enable_copy_on_write()  # semantik pandas sama dengan app
+    summary = run_batch(args.input_dir, args.output, args.format, METHOD_ALIASES[args.method],
+                        args.horizon, args.window, args.season, args.workers)
+    if summary.empty:
+        print(f"Tidak ada file {'/'.join(EXTENSIONS)} di {args.input_dir}.", file=sys.stderr)
+        return 1
+    print(summary.to_string(index=False))
+    return 0 if summary["Status"].str.startswith("OK").all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from utils.timeindex import day_bounds, range_positions
+
+# level agregasi dari halus ke kasar
+LEVELS = {"D": "Harian", "W": "Mingguan", "M": "Bulanan", "Q": "Kuartalan"}
+LEVEL_DAYS = {"D": 1, "W": 7, "M": 30.4, "Q": 91.3}
+STATS = ["sum", "mean", "min", "max", "count"]
+# batas jumlah batang untuk pemilihan level otomatis
+MAX_BUCKETS = 400
+
+# cara menggabungkan statistik dari level yang lebih halus
+_COMBINE = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def _period_start(index: pd.DatetimeIndex, level: str) -> pd.DatetimeIndex:
+    if level == "D":
+        return index.floor("D")
+    return index.to_period(level).to_timestamp()
+
+
+class AggregatePyramid:
+    """Pre-agregasi harian/mingguan/bulanan/kuartalan (sum, min, max, count) per kolom numerik.
+
+    Dibangun sekali per dataset; mean dihitung dari sum/count saat query.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.columns = df.select_dtypes(include="number").columns.tolist()
+        lo, hi = range_positions(df)  # lewati baris NaT
+        data = df.iloc[lo:hi][self.columns].astype(np.float64)
+        data.index = data.index.floor("D")
+        grouped = data.groupby(level=0, sort=True)
+        daily = {"sum": grouped.sum(), "count": grouped.count(),
+                 "min": grouped.min(), "max": grouped.max()}
+        self.levels = {"D": daily}
+        for level in ("W", "M", "Q"):
+            self.levels[level] = self._rollup(daily, _period_start(daily["sum"].index, level))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(t.memory_usage().sum()) for tables in self.levels.values() for t in tables.values())
+
+    @staticmethod
+    def _rollup(tables: dict, keys) -> dict:
+        return {stat: getattr(tables[stat].groupby(keys, sort=True), how)()
+                for stat, how in _COMBINE.items()}
+
+    def auto_level(self, start, end, max_buckets: int = MAX_BUCKETS) -> str:
+        """Level terhalus yang jumlah periodenya pada rentang ini masih <= max_buckets."""
+        days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+        for level, size in LEVEL_DAYS.items():
+            if days / size <= max_buckets:
+                return level
+        return "Q"
+
+    def query(self, level: str, start, end, cols, stat: str = "sum") -> pd.DataFrame:
+        """Agregat per periode `level` untuk tanggal start..end (inklusif, per hari).
+
+        Periode yang seluruhnya di dalam rentang diambil langsung dari level tersebut;
+        periode tepi yang terpotong dihitung ulang dari level harian di dalam rentang.
+        """
+        start, stop = day_bounds(start, end)  # konvensi yang sama dengan range_positions
+        end = stop - pd.Timedelta(days=1)
+        daily = self.levels["D"]
+        index = daily["sum"].index
+        lo, hi = index.searchsorted(start, side="left"), index.searchsorted(stop, side="left")
+        parts = {s: daily[s].iloc[lo:hi][cols] for s in _COMBINE}
+        if level != "D":
+            parts = self._query_level(level, start, end, cols, parts)
+        if stat == "mean":
+            return parts["sum"] / parts["count"].replace(0, np.nan)
+        return parts[stat]
+
+    def _query_level(self, level, start, end, cols, daily_parts):
+        first, last = _period_start(pd.DatetimeIndex([start, end]), level)
+        next_first = (first.to_period(level) + 1).to_timestamp()
+        next_last = (last.to_period(level) + 1).to_timestamp()
+        # periode penuh: key di [full_lo, full_hi)
+        full_lo = first if first == start else next_first
+        full_hi = next_last if next_last - pd.Timedelta(days=1) == end else last
+
+        table = self.levels[level]
+        index = table["sum"].index
+        lo, hi = index.searchsorted(full_lo, side="left"), index.searchsorted(full_hi, side="left")
+        parts = {s: [table[s].iloc[lo:hi][cols]] for s in _COMBINE}
+
+        # periode tepi yang terpotong → agregasi ulang dari harian di dalam rentang
+        days = daily_parts["sum"].index
+        edge = (days < full_lo) | (days >= full_hi)
+        if edge.any():
+            edge_tables = {s: daily_parts[s][edge] for s in _COMBINE}
+            for s, frame in self._rollup(edge_tables, _period_start(days[edge], level)).items():
+                parts[s].append(frame)
+        return {s: pd.concat(frames).sort_index() for s, frames in parts.items()}
+
+    def extend(self, df: pd.DataFrame, n_old: int) -> "AggregatePyramid":
+        """Pyramid baru untuk df = data lama (n_old baris) + baris baru yang tanggalnya lebih akhir.
+
+        Hanya hari/periode yang tersentuh baris baru yang diagregasi ulang.
+        """
+        if df.select_dtypes(include="number").columns.tolist() != self.columns:
+            return AggregatePyramid(df)
+        first_day = df.index[n_old].floor("D")
+        lo, hi = range_positions(df, first_day, None)
+        tail = df.iloc[lo:][self.columns].astype(np.float64)
+        tail.index = tail.index.floor("D")
+        grouped = tail.groupby(level=0, sort=True)
+        daily_tail = {"sum": grouped.sum(), "count": grouped.count(),
+                      "min": grouped.min(), "max": grouped.max()}
+
+        new = AggregatePyramid.__new__(AggregatePyramid)
+        new.columns = self.columns
+        old_daily = self.levels["D"]
+        daily = {s: pd.concat([t[t.index < first_day], daily_tail[s]]) for s, t in old_daily.items()}
+        new.levels = {"D": daily}
+        for level in ("W", "M", "Q"):
+            # periode yang memuat hari baru pertama dan sesudahnya dihitung ulang dari harian
+            p0 = _period_start(pd.DatetimeIndex([first_day]), level)[0]
+            recent = {s: t[t.index >= p0] for s, t in daily.items()}
+            rolled = self._rollup(recent, _period_start(recent["sum"].index, level))
+            new.levels[level] = {s: pd.concat([t[t.index < p0], rolled[s]])
+                                 for s, t in self.levels[level].items()}
+        return new
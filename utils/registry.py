@@ -0,0 +1,338 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from utils.compact import memory_bytes
+from utils.cow import enable_copy_on_write
+from utils.dataset_cache import (
+    content_hash, has_cached, load_cached, load_meta, load_user_dataset, save_cached, save_user_dataset,
+)
+from utils.ingest import append_rows, dataset_meta
+
+MAX_REGISTRY_BYTES = int(os.environ.get("DATASET_REGISTRY_MAX_BYTES", 2 * 1024 * 1024 * 1024))  # default 2 GB
+# dataset yang tidak diakses selama ini dilepas dari RAM (tetap ada di disk, dimuat ulang via mmap)
+IDLE_RELEASE_SECONDS = int(os.environ.get("DATASET_IDLE_SECONDS", 15 * 60))
+# jeda minimal antar pemeriksaan dataset idle
+IDLE_SWEEP_INTERVAL = 60
+# hasil per parameter (forecast, regresi, …) yang disimpan per dataset; yang paling lama tidak dipakai dibuang
+MAX_RESULTS = int(os.environ.get("DATASET_MAX_RESULTS", 64))
+
+
+def _nbytes(value) -> int:
+    # ukuran artefak turunan: atribut nbytes (array, indeks, …), DataFrame/Series,
+    # atau tuple/dict berisi keduanya; selain itu dianggap kecil (0)
+    if isinstance(value, pd.DataFrame):
+        return memory_bytes(value)
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return int(getattr(value, "nbytes", 0))
+
+
+class _Entry:
+    __slots__ = ("df", "nbytes", "last_used", "derived", "results")
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.nbytes = memory_bytes(df)
+        self.derived = {}
+        self.results = OrderedDict()  # name → (hasil, bytes), urutan LRU
+        self.last_used = time.monotonic()
+
+
+class DatasetRegistry:
+    """Dataset bersama satu proses server, dikunci dengan hash isi file.
+
+    Sesi hanya memegang key (lihat DatasetHandle). Entry tanpa referensi
+    dibuang paling lama-tidak-dipakai dulu saat total ukuran melewati batas.
+    Entry yang sudah tersimpan di disk juga dilepas dari RAM setelah idle
+    (walau masih direferensikan sesi) dan dimuat ulang saat diakses lagi.
+    """
+
+    def __init__(self, max_bytes: int = MAX_REGISTRY_BYTES, idle_seconds: float = IDLE_RELEASE_SECONDS):
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._entries = {}
+        self._refs = {}  # key → jumlah sesi; terpisah dari entry agar bertahan saat entry dilepas
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        # semua halaman yang membaca dataset lewat registry, termasuk yang dibuka langsung via URL
+        enable_copy_on_write()
+
+    def put(self, key: str, df: pd.DataFrame):
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry(df)
+            self._entries[key].last_used = time.monotonic()
+            self._evict()
+
+    def get(self, key: str):
+        """Salinan read-only (CoW) dari dataset; dimuat ulang dari cache disk bila perlu."""
+        self._maybe_release_idle()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                return entry.df.copy(deep=False)
+        df = load_cached(key)
+        if df is None:
+            return None
+        self.put(key, df)
+        return df.copy(deep=False)
+
+    def derived(self, key: str, name: str, builder):
+        """Artefak turunan dataset (agregat, indeks, …) yang dibangun sekali per key.
+
+        builder(df) dipanggil di luar lock; ukuran artefak (lihat _nbytes) ikut
+        dihitung untuk eviksi. None jika dataset tidak ada.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and name in entry.derived:
+                return entry.derived[name]
+        df = self.get(key)
+        if df is None:
+            return None
+        value = builder(df)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if name not in entry.derived:
+                    self._store(key, entry, name, value)
+                value = entry.derived[name]
+        return value
+
+    def result(self, key: str, name: str, builder, max_results: int = MAX_RESULTS):
+        """Hasil komputasi per parameter (mis. forecast per horizon) untuk dataset key.
+
+        Berbeda dengan derived: jumlahnya per dataset dibatasi max_results (LRU) karena
+        tiap kombinasi slider menambah satu hasil; ukurannya ikut dihitung untuk eviksi.
+        Tidak diteruskan ke dataset hasil append. None jika dataset tidak ada.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and name in entry.results:
+                entry.results.move_to_end(name)
+                return entry.results[name][0]
+        df = self.get(key)
+        if df is None:
+            return None
+        value = builder(df)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return value
+            if name in entry.results:
+                return entry.results[name][0]
+            size = _nbytes(value)
+            entry.results[name] = (value, size)
+            entry.nbytes += size
+            while len(entry.results) > max_results:
+                _, (_, old_size) = entry.results.popitem(last=False)
+                entry.nbytes -= old_size
+            self._evict()
+        return value
+
+    def _store(self, key: str, entry: _Entry, name: str, value):
+        # dipanggil dengan lock terpegang; artefak yang tumbuh setelah dibangun (mis. kolom
+        # StatsIndex yang dibangun saat diminta) melaporkan tambahan ukurannya lewat charge
+        entry.derived[name] = value
+        entry.nbytes += _nbytes(value)
+        if hasattr(value, "charge"):
+            value.charge = lambda nbytes: self._charge(key, name, value, nbytes)
+
+    def _charge(self, key: str, name: str, value, nbytes: int):
+        # tambahan ukuran hanya dihitung jika artefak itu masih milik entry (bukan entry lama yang dilepas)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.derived.get(name) is value:
+                entry.nbytes += nbytes
+            self._evict()
+
+    def append(self, parent_key: str, key: str, df: pd.DataFrame, n_old):
+        """Daftarkan dataset hasil append dari parent_key.
+
+        Jika baris baru ada di akhir (n_old bukan None), artefak turunan parent
+        yang punya method extend(df, n_old) diperpanjang, bukan dibangun ulang.
+        """
+        with self._lock:
+            parent = self._entries.get(parent_key)
+            parent_derived = dict(parent.derived) if parent is not None else {}
+        self.put(key, df)
+        if n_old is None:
+            return
+        extended = {name: value.extend(df, n_old)
+                    for name, value in parent_derived.items() if hasattr(value, "extend")}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            for name, value in extended.items():
+                if name not in entry.derived:
+                    self._store(key, entry, name, value)
+
+    def entry_bytes(self, key: str):
+        """Ukuran dataset + artefak turunannya di registry, None jika tidak dimuat."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.nbytes if entry is not None else None
+
+    def acquire(self, key: str):
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+
+    def release(self, key: str):
+        with self._lock:
+            refs = self._refs.get(key, 0) - 1
+            if refs > 0:
+                self._refs[key] = refs
+            else:
+                self._refs.pop(key, None)
+            self._evict()
+
+    def release_idle(self, max_idle: float = None) -> int:
+        """Lepas dari RAM dataset yang idle > max_idle detik dan sudah ada di disk; return jumlahnya."""
+        max_idle = self.idle_seconds if max_idle is None else max_idle
+        cutoff = time.monotonic() - max_idle
+        with self._lock:
+            idle = [k for k, e in self._entries.items() if e.last_used < cutoff]
+        # cek disk di luar lock
+        idle = [k for k in idle if has_cached(k)]
+        released = 0
+        with self._lock:
+            for key in idle:
+                entry = self._entries.get(key)
+                if entry is not None and entry.last_used < cutoff:
+                    del self._entries[key]
+                    released += 1
+        return released
+
+    def _maybe_release_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep < IDLE_SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+        self.release_idle()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "bytes": sum(e.nbytes for e in self._entries.values()),
+                "refs": sum(self._refs.values()),
+            }
+
+    def _evict(self):
+        # dipanggil dengan lock terpegang
+        total = sum(e.nbytes for e in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        idle = sorted((e.last_used, k) for k, e in self._entries.items() if not self._refs.get(k))
+        for _, key in idle:
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key).nbytes
+
+
+REGISTRY = DatasetRegistry()
+
+
+class DatasetHandle:
+    """Referensi sesi ke dataset di REGISTRY; referensi dilepas saat sesi dibuang."""
+
+    def __init__(self, key: str):
+        self.key = key
+        REGISTRY.acquire(key)
+        self._finalizer = weakref.finalize(self, REGISTRY.release, key)
+
+    def release(self):
+        self._finalizer()  # aman dipanggil berkali-kali
+
+
+def set_session_dataset(key: str, df: pd.DataFrame):
+    """Daftarkan dataset ke registry dan simpan referensinya di session_state.
+
+    Untuk user yang login, dataset juga dicatat sebagai dataset terakhirnya di disk.
+    """
+    old = st.session_state.get("dataset")
+    if old is None or old.key != key:
+        # referensi diambil sebelum put: eviksi di dalam put tidak boleh membuang dataset ini
+        st.session_state["dataset"] = DatasetHandle(key)
+    REGISTRY.put(key, df)
+    username = st.session_state.get("username")
+    if username:
+        save_user_dataset(username, key, df)
+    if old is not None and old.key != key:
+        old.release()
+
+
+def _restore_user_dataset():
+    """Pulihkan dataset terakhir user (mis. setelah refresh browser) dari file Arrow-nya."""
+    username = st.session_state.get("username")
+    if not username:
+        return None
+    restored = load_user_dataset(username)
+    if restored is None:
+        return None
+    key, df = restored
+    st.session_state["dataset"] = DatasetHandle(key)
+    REGISTRY.put(key, df)
+    return st.session_state["dataset"]
+
+
+def _session_handle():
+    handle = st.session_state.get("dataset")
+    return handle if handle is not None else _restore_user_dataset()
+
+
+def get_session_key():
+    """Key (hash isi) dataset milik sesi aktif, atau None."""
+    handle = _session_handle()
+    return handle.key if handle is not None else None
+
+
+def get_session_dataset():
+    """DataFrame milik sesi aktif (read-only), atau None jika belum ada."""
+    handle = _session_handle()
+    if handle is None:
+        return None
+    df = REGISTRY.get(handle.key)
+    username = st.session_state.get("username")
+    if df is None and username:
+        # cache disk sudah dievict → ambil dari file dataset milik user
+        restored = load_user_dataset(username)
+        if restored is not None and restored[0] == handle.key:
+            REGISTRY.put(handle.key, restored[1])
+            df = REGISTRY.get(handle.key)
+    return df
+
+
+def append_session_dataset(delta_key: str, delta: pd.DataFrame):
+    """Tambahkan delta ke dataset sesi aktif; artefak turunan diperbarui secara inkremental.
+
+    Return (ditambah, dilewati).
+    """
+    base_key = get_session_key()
+    base = get_session_dataset()
+    if base is None:
+        raise ValueError("Belum ada dataset untuk ditambah. Unggah dataset lengkap terlebih dahulu.")
+    new_df, n_old, added, skipped = append_rows(base, delta)
+    if not added:
+        return added, skipped
+    key = content_hash(f"{base_key}+{delta_key}".encode())
+    hold = DatasetHandle(key)  # seperti set_session_dataset: referensi diambil sebelum didaftarkan
+    REGISTRY.append(base_key, key, new_df, n_old)
+    # laporan tipe ikut dataset hasil append; step waktu dihitung ulang untuk data gabungan
+    save_cached(key, new_df, meta={**(load_meta(base_key) or {}), **dataset_meta(new_df)})
+    set_session_dataset(key, new_df)
+    hold.release()
+    return added, skipped
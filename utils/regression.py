@@ -0,0 +1,56 @@
+import numpy as np
+
+from utils.registry import REGISTRY
+from utils.timeindex import slice_range
+
+# di atas jumlah titik ini scatter diganti heatmap densitas (2D histogram)
+DENSITY_THRESHOLD = 20_000
+DENSITY_BINS = 80
+
+
+def fit_ols(x, y) -> dict:
+    """Regresi linear y = slope*x + intercept (closed-form, satu pass vektor)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n < 2:
+        return {"slope": np.nan, "intercept": np.nan, "r2": np.nan, "n": n}
+    mx, my = x.mean(), y.mean()
+    dx, dy = x - mx, y - my
+    sxx, syy, sxy = dx @ dx, dy @ dy, dx @ dy
+    slope = sxy / sxx if sxx else np.nan
+    r2 = (sxy * sxy) / (sxx * syy) if sxx and syy else np.nan
+    return {"slope": slope, "intercept": my - slope * mx, "r2": r2, "n": n}
+
+
+def _xy(df, x_col, y_col, start, end):
+    sub = slice_range(df, start, end)
+    x = sub[x_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    y = sub[y_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return x[valid], y[valid]
+
+
+def _fit(df, x_col, y_col, start, end) -> dict:
+    x, y = _xy(df, x_col, y_col, start, end)
+    fit = fit_ols(x, y)
+    fit["x_min"], fit["x_max"] = (x.min(), x.max()) if len(x) else (np.nan, np.nan)
+    return fit
+
+
+def _density(df, x_col, y_col, start, end, bins: int):
+    x, y = _xy(df, x_col, y_col, start, end)
+    counts, xe, ye = np.histogram2d(x, y, bins=bins)
+    return counts, (xe[:-1] + xe[1:]) / 2, (ye[:-1] + ye[1:]) / 2
+
+
+def cached_fit(key: str, x_col, y_col, start=None, end=None):
+    """fit_ols per (dataset, x, y, rentang) sebagai hasil dataset di registry (LRU); None jika dataset tidak ada."""
+    return REGISTRY.result(key, f"ols:{x_col}:{y_col}:{start}:{end}",
+                            lambda df: _fit(df, x_col, y_col, start, end))
+
+
+def cached_density(key: str, x_col, y_col, start=None, end=None, bins: int = DENSITY_BINS):
+    """Histogram 2D (counts, pusat bin x, pusat bin y); ukuran hasil hanya bergantung pada bins."""
+    return REGISTRY.result(key, f"density:{x_col}:{y_col}:{start}:{end}:{bins}",
+                            lambda df: _density(df, x_col, y_col, start, end, bins))
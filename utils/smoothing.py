@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from utils.forecast import history
+
+# label metode (ditambahkan ke pilihan di halaman Forecasting)
+SMOOTHING_METHODS = ["Holt (Tren)", "Holt-Winters (Musiman)"]
+
+# grid parameter yang dievaluasi sekaligus (vektor) saat fitting
+ALPHA_GRID = np.linspace(0.05, 0.95, 10)
+BETA_GRID = np.array([0.01, 0.05, 0.1, 0.2, 0.3, 0.5])
+GAMMA_GRID = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+
+
+class SmoothingState:
+    """State Holt / Holt-Winters aditif: level, tren, dan komponen musiman.
+
+    advance() memajukan state satu observasi per langkah (O(1)), sehingga data
+    baru cukup di-"update" tanpa fitting ulang dari awal.
+    """
+
+    def __init__(self, alpha, beta, gamma, level, trend, season, n_obs, sse):
+        self.alpha, self.beta, self.gamma = float(alpha), float(beta), float(gamma)
+        self.level, self.trend = float(level), float(trend)
+        self.season = np.asarray(season, dtype=np.float64)  # panjang m (0 untuk Holt)
+        self.n_obs = int(n_obs)
+        self.sse = float(sse)
+
+    @property
+    def m(self) -> int:
+        return len(self.season)
+
+    def copy(self) -> "SmoothingState":
+        return SmoothingState(self.alpha, self.beta, self.gamma, self.level, self.trend,
+                              self.season.copy(), self.n_obs, self.sse)
+
+    def advance(self, values) -> "SmoothingState":
+        for y in np.asarray(values, dtype=np.float64):
+            s = self.n_obs % self.m if self.m else None
+            seas = self.season[s] if self.m else 0.0
+            err = y - (self.level + self.trend + seas)
+            level = self.alpha * (y - seas) + (1 - self.alpha) * (self.level + self.trend)
+            self.trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+            self.level = level
+            if self.m:
+                self.season[s] = self.gamma * (y - level) + (1 - self.gamma) * seas
+            self.sse += err * err
+            self.n_obs += 1
+        return self
+
+    def forecast(self, n: int) -> np.ndarray:
+        k = np.arange(1, n + 1)
+        out = self.level + k * self.trend
+        if self.m:
+            out = out + self.season[(self.n_obs + k - 1) % self.m]
+        return out
+
+
+def fit(y, season: int = 0) -> SmoothingState:
+    """Fitting Holt (season=0) atau Holt-Winters aditif (season=m).
+
+    Semua kombinasi parameter grid dijalankan bersamaan sebagai vektor NumPy
+    dalam satu pass rekursi; dipilih yang SSE one-step-ahead-nya terkecil.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    m = int(season)
+    if m and len(y) < 2 * m:
+        raise ValueError(f"Holt-Winters butuh minimal {2 * m} data (2 × periode musim).")
+    if len(y) < 2:
+        raise ValueError("Butuh minimal 2 data untuk Holt.")
+
+    gammas = GAMMA_GRID if m else np.zeros(1)
+    a, b, g = (p.ravel() for p in np.meshgrid(ALPHA_GRID, BETA_GRID, gammas, indexing="ij"))
+    n_params = len(a)
+
+    # inisialisasi klasik
+    if m:
+        level0 = y[:m].mean()
+        trend0 = (y[m:2 * m].mean() - level0) / m
+        season = np.tile(y[:m] - level0, (n_params, 1))
+    else:
+        level0, trend0 = y[0], y[1] - y[0]
+        season = np.zeros((n_params, 0))
+    level = np.full(n_params, level0)
+    trend = np.full(n_params, trend0)
+    sse = np.zeros(n_params)
+
+    for t, yt in enumerate(y):
+        seas = season[:, t % m] if m else 0.0
+        err = yt - (level + trend + seas)
+        sse += err * err
+        new_level = a * (yt - seas) + (1 - a) * (level + trend)
+        trend = b * (new_level - level) + (1 - b) * trend
+        level = new_level
+        if m:
+            season[:, t % m] = g * (yt - level) + (1 - g) * seas
+
+    best = int(np.nanargmin(sse))
+    return SmoothingState(a[best], b[best], g[best], level[best], trend[best],
+                          season[best], len(y), sse[best])
+
+
+class SmoothingModel:
+    """State Holt / Holt-Winters untuk satu kolom dataset; artefak turunan registry.
+
+    Registry memanggil extend(df, n_old) hanya jika baris baru murni ditambahkan di
+    akhir (lihat DatasetRegistry.append), sehingga state cukup dimajukan dengan baris
+    baru. Dataset yang diurutkan ulang tidak mewarisi artefak → fitting ulang.
+    """
+
+    def __init__(self, df: pd.DataFrame, column, season: int = 0):
+        self.column, self.season = column, int(season)
+        self.state = fit(history(df, column)[column].to_numpy(), self.season)
+
+    def extend(self, df: pd.DataFrame, n_old: int) -> "SmoothingModel":
+        new = SmoothingModel.__new__(SmoothingModel)
+        new.column, new.season = self.column, self.season
+        # salin: state lama mungkin masih dipakai sesi lain
+        new.state = self.state.copy().advance(history(df.iloc[n_old:], self.column)[self.column].to_numpy())
+        return new
+
+    def forecast(self, n: int) -> np.ndarray:
+        return self.state.forecast(n)
+
+    @property
+    def nbytes(self) -> int:
+        return self.state.season.nbytes
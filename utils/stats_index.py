@@ -0,0 +1,203 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.timeindex import range_positions
+
+
+# ukuran blok min/max: per kolom disimpan min/maks tiap blok (O(n / blok)), sisa blok di tepi rentang di-scan
+MINMAX_BLOCK = 1024
+
+
+class _BlockExtrema:
+    """Min/maks rentang dalam O(n) memori: min/maks per blok + sparse table di atas ringkasan blok.
+
+    Query [lo, hi) = sparse table untuk blok penuh + scan paling banyak dua blok parsial di tepi.
+    """
+
+    def __init__(self, values: np.ndarray, block: int = MINMAX_BLOCK):
+        self.block = block
+        self.values = values
+        self.bmin, self.bmax = self._blocks(values, block)
+        self._build()
+
+    @staticmethod
+    def _blocks(values: np.ndarray, block: int):
+        nb = -(-len(values) // block)
+        padded = np.full(nb * block, np.nan)
+        padded[:len(values)] = values
+        padded = padded.reshape(nb, block)
+        # fmin/fmax mengabaikan NaN; blok tanpa nilai valid → ±inf
+        return (np.fmin.reduce(padded, axis=1, initial=np.inf),
+                np.fmax.reduce(padded, axis=1, initial=-np.inf))
+
+    def _build(self):
+        self.tmin = self._sparse(self.bmin, np.minimum)
+        self.tmax = self._sparse(self.bmax, np.maximum)
+
+    @staticmethod
+    def _sparse(base: np.ndarray, op) -> list:
+        # level k: op atas jendela 2^k blok mulai dari tiap blok
+        table = [base]
+        k = 1
+        while (1 << k) <= len(base):
+            prev, half = table[-1], 1 << (k - 1)
+            table.append(op(prev[:-half], prev[half:]))
+            k += 1
+        return table
+
+    @staticmethod
+    def _query(table: list, lo: int, hi: int, op):
+        k = (hi - lo).bit_length() - 1
+        return op(table[k][lo], table[k][hi - (1 << k)])
+
+    def query(self, lo: int, hi: int):
+        """(min, maks) nilai valid di [lo, hi); ±inf jika tidak ada."""
+        first, last = -(-lo // self.block), hi // self.block  # blok penuh: [first, last)
+        if first >= last:
+            part = self.values[lo:hi]
+            return np.fmin.reduce(part, initial=np.inf), np.fmax.reduce(part, initial=-np.inf)
+        low = self._query(self.tmin, first, last, np.minimum)
+        high = self._query(self.tmax, first, last, np.maximum)
+        for part in (self.values[lo:first * self.block], self.values[last * self.block:hi]):
+            low = np.fmin.reduce(part, initial=low)
+            high = np.fmax.reduce(part, initial=high)
+        return low, high
+
+    def extend(self, tail: np.ndarray) -> "_BlockExtrema":
+        new = _BlockExtrema.__new__(_BlockExtrema)
+        new.block = self.block
+        new.values = np.concatenate([self.values, tail])
+        # blok terakhir data lama mungkin belum penuh → dihitung ulang bersama data baru
+        keep = len(self.values) // self.block
+        tmin, tmax = self._blocks(new.values[keep * self.block:], self.block)
+        new.bmin = np.concatenate([self.bmin[:keep], tmin])
+        new.bmax = np.concatenate([self.bmax[:keep], tmax])
+        new._build()  # hanya di atas ringkasan blok: kecil
+        return new
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + sum(a.nbytes for a in self.tmin + self.tmax)
+
+
+class _ColumnStats:
+    """Prefix sum/sum kuadrat/count + min/maks per blok untuk satu kolom (memori O(n))."""
+
+    def __init__(self, values: np.ndarray):
+        valid = ~np.isnan(values)
+        # geser dengan nilai acuan agar sum kuadrat tidak kehilangan presisi (mis. kurs ±15.000)
+        self.ref = float(values[valid][0]) if valid.any() else 0.0
+        shifted = np.where(valid, values - self.ref, 0.0)
+        self.csum = np.concatenate([[0.0], np.cumsum(shifted)])
+        self.csq = np.concatenate([[0.0], np.cumsum(shifted * shifted)])
+        self.ccount = np.concatenate([[0], np.cumsum(valid)])
+        self.extrema = _BlockExtrema(values)
+
+    def summary(self, lo: int, hi: int) -> dict:
+        n = int(self.ccount[hi] - self.ccount[lo])
+        if hi <= lo or n == 0:
+            return {"count": 0, "sum": 0.0, "mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan}
+        s = self.csum[hi] - self.csum[lo]
+        sq = self.csq[hi] - self.csq[lo]
+        var = (sq - s * s / n) / (n - 1) if n > 1 else np.nan
+        lo_val, hi_val = self.extrema.query(lo, hi)
+        return {
+            "count": n,
+            "sum": s + n * self.ref,
+            "mean": s / n + self.ref,
+            "std": float(np.sqrt(max(var, 0.0))) if n > 1 else np.nan,
+            "min": float(lo_val),
+            "max": float(hi_val),
+        }
+
+    def extend(self, values: np.ndarray) -> "_ColumnStats":
+        """Statistik baru = data lama + `values` di akhir; hanya bagian baru yang dihitung."""
+        new = _ColumnStats.__new__(_ColumnStats)
+        valid = ~np.isnan(values)
+        new.ref = self.ref if self.ccount[-1] else (float(values[valid][0]) if valid.any() else 0.0)
+        shifted = np.where(valid, values - new.ref, 0.0)
+        # jika sebelumnya belum ada nilai valid, prefix lama semuanya 0 → ref baru tetap aman
+        new.csum = np.concatenate([self.csum, self.csum[-1] + np.cumsum(shifted)])
+        new.csq = np.concatenate([self.csq, self.csq[-1] + np.cumsum(shifted * shifted)])
+        new.ccount = np.concatenate([self.ccount, self.ccount[-1] + np.cumsum(valid)])
+        new.extrema = self.extrema.extend(values)
+        return new
+
+    def mean(self, lo: int, hi: int) -> float:
+        n = self.ccount[hi] - self.ccount[lo]
+        return (self.csum[hi] - self.csum[lo]) / n + self.ref if hi > lo and n else np.nan
+
+    @property
+    def nbytes(self) -> int:
+        return self.csum.nbytes + self.csq.nbytes + self.ccount.nbytes + self.extrema.nbytes
+
+
+class StatsIndex:
+    """Indeks statistik per dataset: metrik rentang tanggal tanpa scan seluruh rentang.
+
+    Kolom dibangun saat pertama kali diminta (memori O(n) per kolom). Ukuran kolom
+    baru dilaporkan lewat `charge(nbytes)` (diisi registry) agar ikut dihitung untuk eviksi.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._columns = {}
+        self._lock = threading.Lock()
+        self.charge = None
+
+    def _column(self, col) -> _ColumnStats:
+        stats = self._columns.get(col)
+        if stats is None:
+            built = _ColumnStats(self._df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+            with self._lock:
+                stats = self._columns.setdefault(col, built)
+            if stats is built and self.charge is not None:
+                self.charge(built.nbytes)
+        return stats
+
+    def positions(self, start=None, end=None):
+        return range_positions(self._df, start, end)
+
+    def summary(self, col, start=None, end=None) -> dict:
+        """count/sum/mean/std/min/max kolom untuk hari start s.d. hari end (inklusif)."""
+        lo, hi = self.positions(start, end)
+        return self._column(col).summary(lo, hi)
+
+    def window_delta(self, col, start=None, end=None, days: int = 7):
+        """Selisih rata-rata `days` hari terakhir vs `days` hari sebelumnya di dalam rentang.
+
+        None jika salah satu jendela kosong atau data tidak punya index tanggal.
+        """
+        lo, hi = self.positions(start, end)
+        if hi <= lo or not isinstance(self._df.index, pd.DatetimeIndex):
+            return None
+        keys, unit = self._df.index.asi8, self._df.index.unit
+        last = keys[hi - 1]
+        step = pd.Timedelta(days=days).as_unit(unit).value
+        mid = max(lo, int(np.searchsorted(keys, last - step, side="left")))
+        first = max(lo, int(np.searchsorted(keys, last - 2 * step, side="left")))
+        if mid >= hi or first >= mid:
+            return None
+        stats = self._column(col)
+        recent, previous = stats.mean(mid, hi), stats.mean(first, mid)
+        if np.isnan(recent) or np.isnan(previous):
+            return None
+        return recent - previous
+
+    def extend(self, df: pd.DataFrame, n_old: int) -> "StatsIndex":
+        """Indeks untuk df = data lama (n_old baris) + baris baru di akhir.
+
+        Kolom yang sudah dibangun hanya diperpanjang dengan baris baru.
+        """
+        new = StatsIndex(df)
+        for col, stats in list(self._columns.items()):
+            if col in df.columns:
+                tail = df[col].iloc[n_old:].to_numpy(dtype=np.float64, na_value=np.nan)
+                new._columns[col] = stats.extend(tail)
+        return new
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in self._columns.values())
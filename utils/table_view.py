@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.perf import stage
+from utils.registry import REGISTRY
+from utils.timeindex import has_time_index, range_positions
+
+# ====== Konfigurasi tabel ======
+PAGE_SIZES = [25, 50, 100, 500]
+DEFAULT_ORDER = "(urutan tanggal)"
+
+
+def sort_order(df: pd.DataFrame, col, ascending: bool = True) -> np.ndarray:
+    """Posisi baris terurut menurut kolom (stabil, nilai kosong di akhir)."""
+    s = df[col].reset_index(drop=True)
+    order = s.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+    return order.astype(np.int32) if len(order) < np.iinfo(np.int32).max else order
+
+
+def cached_order(key: str, col, ascending: bool = True) -> np.ndarray:
+    """sort_order yang dibangun sekali per (dataset, kolom, arah) dan disimpan di registry."""
+    return REGISTRY.derived(key, f"order:{col}:{'asc' if ascending else 'desc'}",
+                            lambda df: sort_order(df, col, ascending))
+
+
+def _page_count(n: int, size: int) -> int:
+    return max(1, -(-n // size))
+
+
+def paged_table(df: pd.DataFrame, key: str, widget_key: str, lo: int = 0, hi: int = None):
+    """Tabel berhalaman di sisi server untuk baris df[lo:hi] (posisi, mis. hasil filter tanggal).
+
+    Hanya baris pada halaman aktif yang dikirim ke browser. Urutan kolom lain
+    diambil dari indeks urutan yang dihitung sekali per dataset (cached_order).
+    """
+    hi = len(df) if hi is None else hi
+    n = max(hi - lo, 0)
+    date_sorted = has_time_index(df)
+    columns = list(df.columns)
+    page_key = f"{widget_key}_page"
+
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+    with c1:
+        shown = st.multiselect("Kolom ditampilkan", columns, default=columns, key=f"{widget_key}_cols")
+    with c2:
+        sort_by = st.selectbox("Urutkan", [DEFAULT_ORDER] + columns, key=f"{widget_key}_sort")
+    with c3:
+        ascending = st.radio("Arah", ["Naik", "Turun"], horizontal=True, key=f"{widget_key}_dir") == "Naik"
+    with c4:
+        size = st.selectbox("Baris/halaman", PAGE_SIZES, index=1, key=f"{widget_key}_size")
+    pages = _page_count(n, size)
+
+    by_date = sort_by == DEFAULT_ORDER or (date_sorted and sort_by == columns[0])
+    if date_sorted:
+        def jump():
+            # callback disimpan Streamlit bersama widget → jangan menutup df, ambil dari registry
+            target = st.session_state.get(f"{widget_key}_date")
+            data = REGISTRY.get(key) if target is not None else None
+            if data is None:
+                return
+            pos = range_positions(data, target, None)[0] - lo
+            pos = min(max(pos, 0), max(n - 1, 0))
+            st.session_state[page_key] = (pos if ascending else n - 1 - pos) // size + 1
+
+        st.date_input("Lompat ke tanggal", value=None, key=f"{widget_key}_date", on_change=jump,
+                      disabled=not by_date, help="Aktif saat tabel diurutkan menurut tanggal.")
+
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Halaman (dari {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * size
+    stop = min(start + size, n)
+    with stage("tabel:halaman"):
+        if by_date:
+            # data sudah terurut menurut tanggal → halaman cukup berupa slice posisi
+            rows = np.arange(lo + start, lo + stop) if ascending else np.arange(hi - 1 - start, hi - 1 - stop, -1)
+        else:
+            order = cached_order(key, sort_by, ascending)
+            if lo > 0 or hi < len(df):
+                order = order[(order >= lo) & (order < hi)]
+            rows = order[start:stop]
+        window = df.iloc[rows][shown or columns]
+    with stage("kirim:tabel"):
+        st.dataframe(window, use_container_width=True, hide_index=date_sorted)
+    st.caption(f"Baris {start + 1 if n else 0:,}–{stop:,} dari {n:,} · halaman {page:,}/{pages:,}")
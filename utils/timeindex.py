@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+def canonicalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Urutkan dataset menurut kolom pertama (tanggal) dan jadikan DatetimeIndex.
+
+    Dipanggil sekali saat ingest. Kolom tanggal tetap ada sebagai kolom biasa;
+    baris bertanggal kosong (NaT) diletakkan di awal agar index tetap
+    terurut naik secara int64 (NaT = nilai int64 terkecil).
+    Jika kolom pertama bukan tanggal, df dikembalikan apa adanya.
+    """
+    if df.empty:
+        return df
+    date_col = df.columns[0]
+    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        return df
+    out = df.sort_values(by=date_col, kind="stable", na_position="first")
+    out.index = pd.DatetimeIndex(out[date_col].to_numpy())
+    return out
+
+
+def has_time_index(df: pd.DataFrame) -> bool:
+    """True jika df sudah melalui canonicalize (DatetimeIndex terurut)."""
+    return isinstance(df.index, pd.DatetimeIndex)
+
+
+def day_bounds(start=None, end=None):
+    """Rentang hari inklusif → batas setengah terbuka [awal, batas): start 00:00 s.d. sebelum (end + 1 hari) 00:00.
+
+    Satu-satunya konvensi rentang tanggal di aplikasi: tanggal akhir selalu ikut satu hari
+    penuh, juga untuk data per menit/jam. None = tidak dibatasi.
+    """
+    lo = pd.Timestamp(start).floor("D") if start is not None else None
+    hi = pd.Timestamp(end).floor("D") + pd.Timedelta(days=1) if end is not None else None
+    return lo, hi
+
+
+def _positions(df: pd.DataFrame, start, end):
+    keys, unit = df.index.asi8, df.index.unit
+    start, stop = day_bounds(start, end)
+    lo = np.searchsorted(keys, start.as_unit(unit).value, side="left") if start is not None else \
+        np.searchsorted(keys, pd.NaT.value, side="right")
+    hi = np.searchsorted(keys, stop.as_unit(unit).value, side="left") if stop is not None else len(keys)
+    return int(lo), int(max(hi, lo))
+
+
+def range_positions(df: pd.DataFrame, start=None, end=None):
+    """Posisi baris [lo, hi) untuk hari start s.d. hari end (inklusif, lihat day_bounds) via binary search."""
+    if not has_time_index(df):
+        return 0, len(df)
+    return _positions(df, start, end)
+
+
+def slice_range(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Potongan baris hari start s.d. hari end (inklusif) tanpa mask boolean maupun .copy()."""
+    lo, hi = range_positions(df, start, end)
+    return df.iloc[lo:hi]
+
+
+def date_bounds(df: pd.DataFrame):
+    """(tanggal_min, tanggal_max) yang valid, atau (None, None) jika tidak ada."""
+    if not has_time_index(df):
+        return None, None
+    lo, hi = _positions(df, None, None)
+    if lo >= hi:
+        return None, None
+    return df.index[lo], df.index[hi - 1]
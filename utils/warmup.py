@@ -0,0 +1,48 @@
+import importlib
+import os
+import threading
+import time
+
+# ====== Konfigurasi warm-up ======
+# APP_WARMUP=0 mematikan warm-up setelah login
+WARMUP_ENABLED = os.environ.get("APP_WARMUP", "1") != "0"
+# modul berat yang dipakai halaman analisis, urut dari yang paling dibutuhkan
+WARMUP_MODULES = [
+    "numpy", "pandas", "pyarrow", "utils.registry", "utils.stats_index", "utils.pyramid",
+    "plotly.graph_objects", "plotly.express", "openpyxl", "utils.pipeline",
+]
+
+REPORT = {}  # modul → durasi warm-up (ms), ditampilkan di panel Performance
+_started = False
+_lock = threading.Lock()
+
+
+def _warm():
+    for name in WARMUP_MODULES:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        REPORT[name] = (time.perf_counter() - t0) * 1000
+
+    # figure Plotly pertama memuat template & validator → bangun & serialisasi satu figure kecil
+    t0 = time.perf_counter()
+    import pandas as pd
+    import plotly.express as px
+
+    px.line(pd.DataFrame({"x": [0, 1], "y": [0.0, 1.0]}), x="x", y="y", template="plotly_dark").to_json()
+    REPORT["plotly (figure pertama)"] = (time.perf_counter() - t0) * 1000
+
+
+def start_warmup() -> bool:
+    """Jalankan warm-up sekali per proses di thread background; False jika dimatikan/sudah jalan."""
+    global _started
+    if not WARMUP_ENABLED:
+        return False
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=_warm, name="warmup", daemon=True).start()
+    return True
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
 from utils.auth import login, is_logged_in, logout
-
+from utils.warmup import start_warmup
 
 if is_logged_in():
     st.set_page_config(page_title="Dashboard", page_icon="🔐", layout="centered")
@@ -41,6 +40,8 @@ with st.form("login_form", clear_on_submit=False):
 
 if submit:
     if login(u, p):
+        # muat modul berat (pandas, plotly, …) di background selagi pengguna membuka halaman
+        start_warmup()
         st.success("Login berhasil.")
         st.rerun()
     else: